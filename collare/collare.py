@@ -1,40 +1,1448 @@
 from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtGui import QStandardItemModel, QIcon, QFontMetrics
-from PyQt5.QtCore import QTimer, QEventLoop
-from PyQt5.QtWidgets import QMessageBox, QProgressDialog,QTreeWidgetItem, QFileIconProvider,QTreeWidget, QInputDialog, QHBoxLayout, QFrame, QApplication
+from PyQt5.QtCore import Qt, QTimer, QObject, QRunnable, QThreadPool, QAbstractItemModel, QModelIndex, QItemSelectionModel, pyqtSignal
+from PyQt5.QtWidgets import QMessageBox, QProgressDialog,QFileIconProvider, QTreeView, QInputDialog, QHBoxLayout, QFrame, QApplication
 from pathlib import Path
 from subprocess import Popen, PIPE
 from functools import reduce
 from zipfile import ZipFile
-import os, requests, json, re, base64, shutil, sys, time
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import os, requests, json, re, base64, shutil, sys, time, hashlib, struct, zlib, threading, gzip
+try:
+    import zstandard
+except ImportError:
+    # Optional, transfers fall back to gzip without it
+    zstandard = None
 
 collare_home = Path.home() / ".collare_projects"
+# Folders used internally by the client start with '.' so that they cannot collide with project names
+collare_cache = collare_home / ".cache"
+collare_transfers = collare_home / ".transfers"
+collare_quarantine = collare_home / ".quarantine"
+collare_snapshots = collare_home / ".snapshots"
 current_running_file_dir, filename = os.path.split(os.path.abspath(__file__))
 connected = False
 supported_db_names = ["bndb","i64","idb","hop","rzdb","ghdb","jdb2","asp"]
+transfer_chunk_size = 1024 * 1024
+stream_content_type = "application/x-collare-stream"
+manifest_content_type = "application/x-collare-manifest"
+delta_block_size = 64 * 1024
+default_settings = {
+    "cache_size_mb": 10240,
+    "quarantine_size_mb": 4096,
+    "connect_timeout": 3,
+    "read_timeout": 40,
+    "retries": 3,
+    "retry_backoff": 0.5,
+    "pool_size": 8,
+    "upload_workers": 4,
+    "resume_chunk_mb": 8,
+    "compression_level": 3,
+    "events_timeout": 90,
+    "refresh_delay_ms": 300,
+    "snapshot_delay_ms": 2000
+}
 requests.urllib3.disable_warnings()
 
-class ProjectTree(QTreeWidget):
+def load_settings():
+    # Optional user overrides of the default settings
+    settings = dict(default_settings)
+    if os.path.exists(str(collare_home / "settings.json")):
+        with open(str(collare_home / "settings.json"),"r") as settings_file:
+            settings.update(json.load(settings_file))
+    return settings
+
+def file_blocks(fs_path,chunk_size=transfer_chunk_size):
+    with open(fs_path,"rb") as data_file:
+        while True:
+            block = data_file.read(chunk_size)
+            if not block:
+                break
+            yield block
+
+def save_snapshot(project,manifest_json,revision):
+    # Last known manifest of the project, used to show the project before the server is reachable
+    # The manifest comes already serialized, it is the copy taken on the GUI thread while the live manifest keeps changing
+    os.makedirs(str(collare_snapshots),exist_ok=True)
+    snapshot_path = os.path.join(str(collare_snapshots),f"{project}.json.gz")
+    part_path = f"{snapshot_path}.{threading.get_ident()}.part"
+    with gzip.open(part_path,"wt",encoding="utf-8") as snapshot_file:
+        snapshot_file.write(json.dumps({"project":project,"revision":revision})[:-1] + ',"manifest":')
+        snapshot_file.write(manifest_json)
+        snapshot_file.write("}")
+    os.replace(part_path,snapshot_path)
+
+def load_snapshot(project):
+    snapshot_path = os.path.join(str(collare_snapshots),f"{project}.json.gz")
+    if not os.path.exists(snapshot_path):
+        return None
+    with gzip.open(snapshot_path,"rt",encoding="utf-8") as snapshot_file:
+        return json.load(snapshot_file)
+
+def stream_file_body(header,fs_path,chunk_size=transfer_chunk_size,compression=None,level=3):
+    # Streamed request body: one JSON line with metadata followed by raw file content read in fixed-size blocks
+    # With 'compression' the metadata names the method and the content after the metadata line is compressed
+    if compression:
+        header = dict(header,compression=compression)
+    yield (json.dumps(header) + "\n").encode("utf-8")
+    if compression:
+        yield from compress_chunks(file_blocks(fs_path,chunk_size),compression,level)
+    else:
+        yield from file_blocks(fs_path,chunk_size)
+
+def compressor(method,level):
+    # Streaming compressor for the transfer compression methods ("zstd" or "gzip")
+    if method == "zstd":
+        return zstandard.ZstdCompressor(level=level).compressobj()
+    return zlib.compressobj(max(1,min(level,9)),zlib.DEFLATED,16 + zlib.MAX_WBITS)
+
+def decompressor(method):
+    if method == "zstd":
+        return zstandard.ZstdDecompressor().decompressobj()
+    return zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+def compress_chunks(chunks,method,level):
+    stream = compressor(method,level)
+    for chunk in chunks:
+        data = stream.compress(chunk)
+        if data:
+            yield data
+    yield stream.flush()
+
+def decompress_chunks(chunks,method):
+    stream = decompressor(method)
+    for chunk in chunks:
+        data = stream.decompress(chunk)
+        if data:
+            yield data
+
+class ChecksumError(ValueError):
+    # Transferred file does not match the sha256 it was sent with
+    pass
+
+def file_digest(fs_path):
+    hasher = hashlib.sha256()
+    with open(fs_path,"rb") as data_file:
+        while True:
+            block = data_file.read(transfer_chunk_size)
+            if not block:
+                break
+            hasher.update(block)
+    return hasher.hexdigest()
+
+class ChunkReader:
+    # File-like view over the chunks of a streamed response
+    def __init__(self,chunks):
+        self.chunks = iter(chunks)
+        self.buffer = b""
+
+    def fill(self,size):
+        while len(self.buffer) < size:
+            chunk = next(self.chunks,None)
+            if chunk is None:
+                return False
+            self.buffer += chunk
+        return True
+
+    def read(self,size):
+        self.fill(size)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+    def readline(self):
+        # Metadata line of the stream framing (see stream_file_body)
+        while b"\n" not in self.buffer:
+            if not self.fill(len(self.buffer) + 1):
+                raise ValueError("Incomplete response")
+        line, self.buffer = self.buffer.split(b"\n",1)
+        return line
+
+    def __iter__(self):
+        if self.buffer:
+            yield self.buffer
+            self.buffer = b""
+        yield from self.chunks
+
+class JSONFileFieldDecoder:
+    # Incremental parser for the legacy {"file": "<base64>", ...} replies
+    # The base64 encoded 'file' value is decoded straight into 'dest_file', all other (small) fields end up in 'fields'
+    string_special = re.compile(rb'[\\"]')
+
+    def __init__(self,dest_file,field="file"):
+        self.dest_file = dest_file
+        self.field = field
+        self.fields = {}
+        self.state = "start"
+        self.token = bytearray()
+        self.key = None
+        self.in_string = False
+        self.escaped = False
+        self.depth = 0
+        self.base64_tail = b""
+
+    def feed(self,data):
+        pos = 0
+        while pos < len(data):
+            if self.in_string:
+                pos = self.scanString(data,pos)
+                continue
+            char = data[pos:pos+1]
+            pos += 1
+            if self.state == "start":
+                if char == b"{":
+                    self.state = "key"
+            elif self.state == "key":
+                if char == b'"':
+                    self.token = bytearray(b'"')
+                    self.in_string = True
+                elif char == b"}":
+                    self.state = "done"
+            elif self.state == "colon":
+                if char == b":":
+                    self.state = "value_start"
+            elif self.state == "value_start":
+                if char.isspace():
+                    continue
+                if char == b'"' and self.key == self.field:
+                    self.state = "file"
+                    self.in_string = True
+                else:
+                    self.state = "value"
+                    self.token = bytearray()
+                    self.valueChar(char)
+            elif self.state == "value":
+                self.valueChar(char)
+            elif self.state == "separator":
+                if char == b",":
+                    self.state = "key"
+                elif char == b"}":
+                    self.state = "done"
+
+    def valueChar(self,char):
+        # Collects non-file values, these are decoded by json once complete
+        if self.depth == 0 and char in (b",",b"}"):
+            self.fields[self.key] = json.loads(bytes(self.token))
+            self.state = "key" if char == b"," else "done"
+            return
+        self.token += char
+        if char == b'"':
+            self.in_string = True
+        elif char in (b"{",b"["):
+            self.depth += 1
+        elif char in (b"}",b"]"):
+            self.depth -= 1
+
+    def scanString(self,data,pos):
+        # Consumes string content up to the closing quote without looking at each character in Python
+        if self.escaped:
+            self.escaped = False
+            self.appendString(data[pos:pos+1])
+            return pos + 1
+        match = self.string_special.search(data,pos)
+        end = match.start() if match else len(data)
+        self.appendString(data[pos:end])
+        if not match:
+            return end
+        if data[end:end+1] == b"\\":
+            if self.state != "file":
+                # Keep escape sequences of other values for json to decode
+                self.token += b"\\"
+            if end + 1 < len(data):
+                self.appendString(data[end+1:end+2])
+                return end + 2
+            self.escaped = True
+            return end + 1
+        self.in_string = False
+        if self.state == "key":
+            self.token += b'"'
+            self.key = json.loads(bytes(self.token))
+            self.state = "colon"
+        elif self.state == "file":
+            if self.base64_tail:
+                raise ValueError("Invalid base64 content")
+            self.state = "separator"
+        else:
+            self.token += b'"'
+        return end + 1
+
+    def appendString(self,chunk):
+        if self.state != "file":
+            self.token += chunk
+            return
+        data = self.base64_tail + chunk
+        cut = len(data) - (len(data) % 4)
+        if cut:
+            self.dest_file.write(base64.b64decode(data[:cut]))
+        self.base64_tail = data[cut:]
+
+    def close(self):
+        if self.state != "done":
+            raise ValueError("Incomplete response")
+        return self.fields
+
+def file_signatures(fs_path,block_size=delta_block_size):
+    # Signatures of all full blocks of the base file for delta transfers as {adler32: {md5: offset}}
+    signatures = {}
+    offset = 0
+    with open(fs_path,"rb") as base_file:
+        while True:
+            block = base_file.read(block_size)
+            if len(block) < block_size:
+                break
+            signatures.setdefault(zlib.adler32(block),{})[hashlib.md5(block).digest()] = offset
+            offset += block_size
+    return signatures
+
+def delta_ops(signatures,fs_path,block_size=delta_block_size):
+    # Yields operations rebuilding 'fs_path' from the base file described by 'signatures':
+    #   C <u64 offset> <u32 length>  copy from the base file
+    #   D <u32 length> <data>        literal data
+    #   E <sha256>                   end of delta with checksum of the rebuilt file
+    # Unchanged blocks at the same position are found with a single lookup. After a mismatch the rolling checksum
+    # is moved byte by byte over the next block to find shifted content, repeated misses back off exponentially
+    # so that large regions of new data do not end up being scanned byte by byte in Python.
+    def lookup(block,weak):
+        if weak in signatures:
+            return signatures[weak].get(hashlib.md5(block).digest())
+        return None
+    hasher = hashlib.sha256()
+    literal = bytearray()
+    copy_offset, copy_length = None, 0
+    backoff, skip = 1, 0
+    buf, pos = b"", 0
+    with open(fs_path,"rb") as new_file:
+        while True:
+            if len(buf) - pos < 2 * block_size:
+                data = new_file.read(max(transfer_chunk_size,2 * block_size))
+                hasher.update(data)
+                buf, pos = buf[pos:] + data, 0
+            if len(buf) - pos < block_size:
+                break
+            block = buf[pos:pos+block_size]
+            weak = zlib.adler32(block)
+            match = lookup(block,weak)
+            if match is None and skip == 0:
+                # Rolling search for shifted content, adler32 is rolled as in rsync
+                start = pos
+                end = min(pos + block_size,len(buf) - block_size)
+                a, b = weak & 0xffff, weak >> 16
+                while pos < end:
+                    out_byte, in_byte = buf[pos], buf[pos+block_size]
+                    a = (a - out_byte + in_byte) % 65521
+                    b = (b - block_size * out_byte + a - 1) % 65521
+                    pos += 1
+                    if (b << 16 | a) in signatures:
+                        match = lookup(buf[pos:pos+block_size],b << 16 | a)
+                        if match is not None:
+                            break
+                if pos > start:
+                    if copy_offset is not None:
+                        yield b"C" + struct.pack(">QI",copy_offset,copy_length)
+                        copy_offset = None
+                    literal += buf[start:pos]
+                if match is None:
+                    skip, backoff = backoff, min(backoff * 2,64)
+            elif match is None:
+                if copy_offset is not None:
+                    yield b"C" + struct.pack(">QI",copy_offset,copy_length)
+                    copy_offset = None
+                literal += block
+                pos += block_size
+                skip -= 1
+            if match is not None:
+                if literal:
+                    yield b"D" + struct.pack(">I",len(literal)) + bytes(literal)
+                    literal = bytearray()
+                if copy_offset is not None and copy_offset + copy_length == match:
+                    copy_length += block_size
+                else:
+                    if copy_offset is not None:
+                        yield b"C" + struct.pack(">QI",copy_offset,copy_length)
+                    copy_offset, copy_length = match, block_size
+                pos += block_size
+                backoff, skip = 1, 0
+            elif len(literal) >= transfer_chunk_size:
+                yield b"D" + struct.pack(">I",len(literal)) + bytes(literal)
+                literal = bytearray()
+    if copy_offset is not None:
+        yield b"C" + struct.pack(">QI",copy_offset,copy_length)
+    literal += buf[pos:]
+    if literal:
+        yield b"D" + struct.pack(">I",len(literal)) + bytes(literal)
+    yield b"E" + hasher.digest()
+
+def apply_delta(base_path,reader,dest_file):
+    # Rebuilds file from the base file and operations produced by delta_ops
+    hasher = hashlib.sha256()
+    with open(base_path,"rb") as base_file:
+        while True:
+            op = reader.read(1)
+            if op == b"C":
+                offset, length = struct.unpack(">QI",reader.read(12))
+                base_file.seek(offset)
+            elif op == b"D":
+                length, = struct.unpack(">I",reader.read(4))
+            elif op == b"E":
+                if reader.read(32) != hasher.digest():
+                    raise ChecksumError("Checksum of the patched file does not match")
+                return
+            else:
+                raise ValueError("Incomplete delta")
+            while length:
+                data = base_file.read(min(length,transfer_chunk_size)) if op == b"C" else reader.read(min(length,transfer_chunk_size))
+                if not data:
+                    raise ValueError("Delta does not match the base file")
+                hasher.update(data)
+                dest_file.write(data)
+                length -= len(data)
+
+def write_changes(folder,changes):
+    # changes.json of a downloaded DB version, an export delta and journal left by the IDA plugin belong to the previous one
+    with open(os.path.join(folder,"changes.json"),"wb") as changes_file:
+        changes_file.write(changes)
+    for name in ["changes.delta.json","changes.journal"]:
+        if os.path.exists(os.path.join(folder,name)):
+            os.remove(os.path.join(folder,name))
+
+def read_changes_delta(folder,db_name,changes):
+    # Delta against the checked-out changes.json written by plugins that export incrementally, write_changes removes it
+    # whenever another version is downloaded. changes.json is shared by the DBs of all tools in the folder, so the delta is
+    # used only when it was exported from 'db_name' together with the current 'changes'
+    delta_path = os.path.join(folder,"changes.delta.json")
+    if not os.path.exists(delta_path):
+        return None
+    with open(delta_path,"rb") as delta_file:
+        content = delta_file.read()
+    try:
+        delta = json.loads(content)
+    except ValueError:
+        return None
+    if delta.get("db") != db_name or delta.get("changes_hash") != hashlib.sha256(changes).hexdigest():
+        return None
+    return base64.b64encode(content).decode("utf-8")
+
+def manifest_revision(response):
+    # Servers that version the manifest send the revision as ETag of '/openproject'
+    etag = response.headers.get("ETag")
+    if not etag:
+        return None
+    return etag.strip('"')
+
+def apply_manifest_changes(manifest,changes):
+    # Applies '/manifestdelta' changes in place, each replaces the entry at 'path' with 'value' or removes it when 'value' is null
+    for change in changes:
+        parent = reduce(dict.get,change["path"][:-1],manifest)
+        if parent is None:
+            continue
+        if change["value"] is None:
+            parent.pop(change["path"][-1],None)
+        else:
+            parent[change["path"][-1]] = change["value"]
+
+def iter_lines(chunks):
+    # Splits streamed chunks into lines without copying the rest of the chunk for every line
+    pending = b""
+    for chunk in chunks:
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+def owner_path(path,value):
+    # Path of the indexed entry that a manifest path belongs to, everything below a '__' field ('__locked__',
+    # '__rev_dbs__'/<db>/'checked-out', ...) and values that are not entries are fields of the entry before them
+    for position, name in enumerate(path):
+        if name.startswith("__"):
+            return path[:position]
+    return path if type(value) is dict else path[:-1]
+
+def read_manifest_stream(lines):
+    # Builds the manifest and its index from the entries of a streamed '/openproject' reply, one {"path": [...], "value": ...}
+    # per line with parents before their children, folder values come without their children
+    manifest, index = {}, ManifestIndex({})
+    for line in lines:
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        path = tuple(entry["path"])
+        owner = owner_path(path,entry["value"])
+        if owner != path:
+            # Field of an entry that is indexed already
+            node = index.nodes.get(owner) if owner else index.root
+            if node is None:
+                raise ValueError("Manifest entry without parent")
+            container = node.value if owner else manifest
+            for name in path[len(owner):-1]:
+                container = container.setdefault(name,{})
+            container[path[-1]] = entry["value"]
+            if owner:
+                index.reindex(owner)
+            continue
+        parent = index.nodes.get(path[:-1]) if len(path) > 1 else index.root
+        if parent is None:
+            raise ValueError("Manifest entry without parent")
+        if len(path) > 1:
+            parent.value[path[-1]] = entry["value"]
+        else:
+            manifest[path[0]] = entry["value"]
+        index.add(parent,path,entry["value"])
+    return manifest, index
+
+class ManifestNode:
+    # Entry of the manifest index, DB entries carry the lock and version data of their '__rev_dbs__' record
+    # Summarized entries have only the latest version ('count' versions in total, 'latest_hash'), see loadVersionHistory
+    __slots__ = ["name","kind","parent","children","value","locked","latest","versions","hashes","digest","count"]
+
+    def __init__(self,name,kind,parent,value):
+        self.name = name
+        self.kind = kind
+        self.parent = parent
+        self.children = {}
+        self.value = value
+        self.locked = value.get("checked-out") if kind == "db" else value.get("__locked__")
+        self.latest = value.get("latest")
+        self.versions = value.get("versions",[])
+        self.hashes = value.get("hashes",[])
+        self.digest = value.get("__hash__")
+        self.count = value.get("count",len(self.versions))
+
+    def summarized(self):
+        return len(self.versions) < self.count
+
+    def versionHash(self,version):
+        if 0 <= version < len(self.hashes):
+            return self.hashes[version]
+        elif version == self.latest:
+            return self.value.get("latest_hash")
+        return None
+
+class ManifestIndex:
+    # Path to entry map over the project manifest, paths are the same as in the project tree ([project, ..., binary, db])
+    def __init__(self,manifest):
+        self.nodes = {}
+        self.root = ManifestNode("","folder",None,{})
+        for name, value in manifest.items():
+            if type(value) is dict:
+                self.add(self.root,(name,),value)
+
+    def add(self,parent,path,value):
+        if value.get("__file__type__") == True:
+            kind = "binary"
+        elif value.get("__file__type__") == False:
+            kind = "folder"
+        else:
+            kind = ""
+        node = ManifestNode(path[-1],kind,parent,value)
+        parent.children[path[-1]] = node
+        self.nodes[path] = node
+        pending = [(node,path,value)]
+        while pending:
+            node, path, value = pending.pop()
+            for key, val in value.items():
+                if type(val) is not dict or key.startswith("__"):
+                    continue
+                kind = "binary" if val.get("__file__type__") == True else "folder" if val.get("__file__type__") == False else ""
+                child = ManifestNode(key,kind,node,val)
+                node.children[key] = child
+                self.nodes[path + (key,)] = child
+                pending.append((child,path + (key,),val))
+            if node.kind == "binary":
+                for rev_db, rev_db_value in value.get("__rev_dbs__",{}).items():
+                    child = ManifestNode(rev_db,"db",node,rev_db_value)
+                    node.children[rev_db] = child
+                    self.nodes[path + (rev_db,)] = child
+
+    def remove(self,path):
+        node = self.nodes.pop(path,None)
+        if node is None:
+            return
+        node.parent.children.pop(node.name,None)
+        pending = [(node,path)]
+        while pending:
+            node, path = pending.pop()
+            for name, child in node.children.items():
+                self.nodes.pop(path + (name,),None)
+                pending.append((child,path + (name,)))
+
+    def update(self,changes):
+        # Same changes as apply_manifest_changes, only the changed subtrees are re-indexed
+        for change in changes:
+            path = tuple(change["path"])
+            owner = owner_path(path,change["value"])
+            if owner != path:
+                # Field of an entry, already changed in its value
+                self.reindex(owner)
+                continue
+            self.remove(path)
+            parent = self.nodes.get(path[:-1]) if len(path) > 1 else self.root
+            if parent is not None:
+                self.add(parent,path,change["value"])
+
+    def reindex(self,path):
+        # Indexes the entry at 'path' again from its current value
+        node = self.nodes.get(path)
+        if node is None or node.kind == "db":
+            return
+        self.remove(path)
+        self.add(node.parent,path,node.value)
+
+    def get(self,path):
+        return self.nodes.get(tuple(path))
+
+    def localPaths(self,path):
+        # Paths of the folders and binaries in the subtree of 'path', these are the ones with a local directory
+        node = self.nodes.get(tuple(path))
+        if node is None:
+            return []
+        paths = []
+        pending = [(node,tuple(path))]
+        while pending:
+            node, path = pending.pop()
+            if node.kind == "db":
+                continue
+            paths.append(path)
+            for name, child in node.children.items():
+                pending.append((child,path + (name,)))
+        return paths
+
+    def path(self,node):
+        path = []
+        while node is not self.root:
+            path.append(node.name)
+            node = node.parent
+        path.reverse()
+        return path
+
+class CollaREClient:
+    # All calls to the server go through one pooled keep-alive session so that the connection is reused between calls
+    def __init__(self,server,username,password,cert,settings):
+        self.server = server
+        self.timeout = (settings["connect_timeout"],settings["read_timeout"])
+        self.capabilities = []
+        self.retries = settings["retries"]
+        self.resume_chunk_size = settings["resume_chunk_mb"] * 1024 * 1024
+        self.compression_level = settings["compression_level"]
+        self.session = requests.Session()
+        self.session.auth = (username,password)
+        self.session.verify = cert
+        # Only idempotent requests are retried after the request was sent, connection failures are retried for all
+        retries = Retry(total=settings["retries"],backoff_factor=settings["retry_backoff"],status_forcelist=[502,503,504],allowed_methods=frozenset(["GET","HEAD"]))
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1,pool_maxsize=settings["pool_size"],max_retries=retries)
+        self.session.mount("https://",adapter)
+        self.session.mount("http://",adapter)
+
+    def get(self,endpoint,**kwargs):
+        return self.session.get(f'{self.server}/{endpoint}', timeout=self.timeout, **kwargs)
+
+    def post(self,endpoint,**kwargs):
+        return self.session.post(f'{self.server}/{endpoint}', timeout=self.timeout, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+    def loadCapabilities(self):
+        # Optional protocol features announced by the server, older servers do not know this endpoint
+        try:
+            response = self.get("capabilities")
+            if response.status_code == 200:
+                self.capabilities = response.json()["capabilities"]
+        except:
+            self.capabilities = []
+
+    def supportedCompression(self):
+        # Transfer compression methods both sides understand, preferred first (compression_level 0 disables compression)
+        methods = []
+        if self.compression_level > 0:
+            if zstandard and "compress_zstd" in self.capabilities:
+                methods.append("zstd")
+            if "compress_gzip" in self.capabilities:
+                methods.append("gzip")
+        return methods
+
+    def uploadCompression(self):
+        methods = self.supportedCompression()
+        return methods[0] if methods else None
+
+    def upload(self,endpoint,fs_path,values):
+        # Sends file to the server, streamed if the server supports it otherwise as base64 encoded JSON (legacy servers)
+        if "resumable_upload" in self.capabilities and os.path.getsize(fs_path) > self.resume_chunk_size:
+            return self.uploadResumable(endpoint,fs_path,values)
+        if "stream_upload" in self.capabilities:
+            return self.post(endpoint, data=stream_file_body(values,fs_path,compression=self.uploadCompression(),level=self.compression_level), headers={"Content-Type":stream_content_type})
+        with open(fs_path, "rb") as data_file:
+            encoded_file = base64.b64encode(data_file.read()).decode("utf-8")
+        return self.post(endpoint, json=dict(values,file=encoded_file))
+
+    def uploadDelta(self,endpoint,fs_path,values,signatures):
+        # Sends only the blocks of 'fs_path' that are not in the base version the server has, 'values' name the base version
+        compression = self.uploadCompression()
+        def delta_body():
+            if compression:
+                yield (json.dumps(dict(values,compression=compression)) + "\n").encode("utf-8")
+                yield from compress_chunks(delta_ops(signatures,fs_path),compression,self.compression_level)
+            else:
+                yield (json.dumps(values) + "\n").encode("utf-8")
+                yield from delta_ops(signatures,fs_path)
+        return self.post(endpoint, data=delta_body(), headers={"Content-Type":stream_content_type})
+
+    def uploadResumable(self,endpoint,fs_path,values):
+        # Sends the file in numbered chunks to an upload session, the session id is kept in a journal so that an
+        # interrupted upload (also after restarting the client) continues with the first chunk the server is missing
+        # The server checks the sha256 of the assembled file and then handles it as a regular request to 'endpoint'
+        digest = file_digest(fs_path)
+        size = os.path.getsize(fs_path)
+        os.makedirs(str(collare_transfers),exist_ok=True)
+        journal_key = hashlib.sha256(json.dumps([self.server,endpoint,digest,values],sort_keys=True).encode("utf-8")).hexdigest()
+        journal_path = os.path.join(str(collare_transfers),journal_key + ".upload")
+        session_id = None
+        # Every chunk is compressed on its own so that chunk boundaries stay at raw file offsets
+        compression = self.uploadCompression()
+        if os.path.exists(journal_path):
+            with open(journal_path,"r") as journal_file:
+                session_id = json.load(journal_file)["session"]
+        failures = 0
+        while True:
+            try:
+                received = None
+                if session_id:
+                    response = self.get("upload/status", params={"session":session_id})
+                    if response.status_code == 200:
+                        received = response.json()["received"]
+                if received is None:
+                    # Unknown or expired session
+                    response = self.post("upload/start", json={"endpoint":endpoint,"size":size,"hash":digest,"chunk_size":self.resume_chunk_size,"compression":compression})
+                    if response.status_code != 200:
+                        return response
+                    session_id = response.json()["session"]
+                    received = 0
+                    with open(journal_path,"w") as journal_file:
+                        json.dump({"session":session_id},journal_file)
+                with open(fs_path,"rb") as data_file:
+                    data_file.seek(received * self.resume_chunk_size)
+                    index = received
+                    while True:
+                        block = data_file.read(self.resume_chunk_size)
+                        if not block:
+                            break
+                        if compression:
+                            stream = compressor(compression,self.compression_level)
+                            block = stream.compress(block) + stream.flush()
+                        response = self.post("upload/chunk", params={"session":session_id,"index":index}, data=block, headers={"Content-Type":"application/octet-stream"})
+                        if response.status_code != 200:
+                            return response
+                        index += 1
+                        failures = 0
+                response = self.post("upload/finish", json=dict(values,session=session_id))
+                break
+            except requests.exceptions.RequestException:
+                failures += 1
+                if failures > self.retries:
+                    raise
+                time.sleep(failures)
+        if response.status_code == 200:
+            # Session is consumed by the server, after a mismatch the next attempt starts from scratch
+            os.remove(journal_path)
+            if response.text == "HASH_MISMATCH":
+                raise ChecksumError("Checksum of the uploaded file does not match")
+        return response
+
+    def download(self,endpoint,values,file_path,delta_base=None):
+        # Streams file from the server into 'file_path' with bounded memory
+        # Servers that understand the stream content type reply with raw file content, others with the legacy base64 JSON
+        # When 'delta_base' (local copy of the version named in the request) is given the server may reply with a delta against it
+        # Returns the response and the remaining fields of the reply (None when the server replied with a status text instead of a file)
+        # With 'resumable_download' the sha256 of the file is kept in a journal next to the '.part' file and an interrupted
+        # download continues with a Range request for the missing bytes
+        part_path = file_path + ".part"
+        journal_path = file_path + ".part.json"
+        failures = 0
+        while True:
+            headers = {"Accept":f"{stream_content_type}, application/json"}
+            request_values = values
+            if self.supportedCompression():
+                request_values = dict(values,compression=self.supportedCompression())
+            journal = None
+            if "resumable_download" in self.capabilities and os.path.exists(journal_path) and os.path.exists(part_path):
+                with open(journal_path,"r") as journal_file:
+                    journal = json.load(journal_file)
+                headers["Range"] = f"bytes={os.path.getsize(part_path)}-"
+                headers["If-Range"] = f'"{journal["hash"]}"'
+                # Partial content is never a delta and not compressed so that the offset refers to the file itself
+                request_values = {key: value for key, value in values.items() if key != "delta_base"}
+            try:
+                return self.downloadOnce(endpoint,request_values,headers,part_path,journal_path,journal,file_path,delta_base)
+            except (requests.exceptions.ConnectionError,requests.exceptions.Timeout,requests.exceptions.ChunkedEncodingError):
+                failures += 1
+                if "resumable_download" not in self.capabilities or not os.path.exists(journal_path) or failures > self.retries:
+                    raise
+                time.sleep(failures)
+
+    def downloadOnce(self,endpoint,values,headers,part_path,journal_path,journal,file_path,delta_base):
+        response = self.post(endpoint, json=values, headers=headers, stream=True)
+        content_type = response.headers.get("Content-Type","")
+        if response.status_code not in [200,206] or not (content_type.startswith(stream_content_type) or content_type.startswith("application/json")):
+            response.content
+            return response, None
+        chunks = response.iter_content(transfer_chunk_size)
+        if content_type.startswith(stream_content_type):
+            reader = ChunkReader(chunks)
+            metadata = json.loads(reader.readline())
+            if metadata.get("compression"):
+                reader = ChunkReader(decompress_chunks(reader,metadata["compression"]))
+            hasher = hashlib.sha256()
+            if response.status_code == 206 and journal and metadata.get("hash") == journal["hash"]:
+                # Server continues where the previous attempt stopped
+                with open(part_path,"rb") as part_file:
+                    while True:
+                        block = part_file.read(transfer_chunk_size)
+                        if not block:
+                            break
+                        hasher.update(block)
+                mode = "ab"
+            else:
+                mode = "wb"
+            with open(part_path,mode) as dest_file:
+                if metadata.get("delta"):
+                    apply_delta(delta_base,reader,dest_file)
+                else:
+                    if "resumable_download" in self.capabilities and metadata.get("hash"):
+                        with open(journal_path,"w") as journal_file:
+                            json.dump({"hash":metadata["hash"]},journal_file)
+                    for chunk in reader:
+                        hasher.update(chunk)
+                        dest_file.write(chunk)
+            if not metadata.get("delta") and metadata.get("hash") and hasher.hexdigest() != metadata["hash"]:
+                os.remove(part_path)
+                if os.path.exists(journal_path):
+                    os.remove(journal_path)
+                raise ChecksumError("Checksum of the downloaded file does not match")
+        else:
+            with open(part_path,"wb") as dest_file:
+                decoder = JSONFileFieldDecoder(dest_file)
+                for chunk in chunks:
+                    decoder.feed(chunk)
+                metadata = decoder.close()
+        os.replace(part_path,file_path)
+        if os.path.exists(journal_path):
+            os.remove(journal_path)
+        return response, metadata
+
+    def manifestParams(self,params):
+        # Servers announcing 'manifest_summary' leave out the version histories, they are loaded with '/history' when needed
+        if "manifest_summary" in self.capabilities:
+            return dict(params,history="summary")
+        return params
+
+    def fetchManifest(self,project,headers={}):
+        # Gets the project manifest and builds its index, returns the response with (manifest, index) or None for replies
+        # without manifest (304, errors, status texts)
+        # 'manifest_stream' servers send one entry per line (optionally compressed, named in the metadata line) which is parsed
+        # while it is being received, so the raw reply is never held in memory
+        params = self.manifestParams({"project":project})
+        if "manifest_stream" in self.capabilities:
+            headers = dict(headers,Accept=f"{manifest_content_type}, application/json")
+            if self.supportedCompression():
+                params["compression"] = ",".join(self.supportedCompression())
+        response = self.get("openproject", params=params, headers=headers, stream=True)
+        if response.status_code == 200 and response.headers.get("Content-Type","").startswith(manifest_content_type):
+            reader = ChunkReader(response.iter_content(transfer_chunk_size))
+            metadata = json.loads(reader.readline())
+            chunks = decompress_chunks(reader,metadata["compression"]) if metadata.get("compression") else reader
+            return response, read_manifest_stream(iter_lines(chunks))
+        if response.status_code != 200 or response.text == "PROJECT_DOES_NOT_EXIST":
+            return response, None
+        manifest = response.json()
+        return response, (manifest,ManifestIndex(manifest))
+
+    def fetchHistory(self,values):
+        # Full version history of a DB of a summarized manifest, {"versions": [...], "hashes": [...]}
+        response = self.post("history", json=values)
+        if response.status_code != 200 or response.text in ["PROJECT_DOES_NOT_EXIST","FILE_DOES_NOT_EXIST"]:
+            return None
+        return response.json()
+
+    def fetchSignatures(self,values):
+        # Same as file_signatures but computed by the server, the reply is a sequence of (adler32, md5) records of full blocks
+        response = self.post("signatures", json=dict(values,block_size=delta_block_size), stream=True)
+        if response.status_code != 200 or not response.headers.get("Content-Type","").startswith(stream_content_type):
+            return None
+        signatures = {}
+        offset = 0
+        reader = ChunkReader(response.iter_content(transfer_chunk_size))
+        while True:
+            record = reader.read(20)
+            if len(record) < 20:
+                break
+            weak, strong = struct.unpack(">I16s",record)
+            signatures.setdefault(weak,{})[strong] = offset
+            offset += delta_block_size
+        return signatures
+
+
+class BlobCache:
+    # Content-addressed local store of downloaded DB versions and binaries, files are named by sha256 of their content
+    # DB versions keep the matching changes.json next to them, least recently used entries are evicted over 'max_size'
+    def __init__(self,cache_dir,max_size):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        # Background tasks fill the cache concurrently
+        self.lock = threading.Lock()
+
+    def blobPath(self,digest):
+        return os.path.join(str(self.cache_dir),digest)
+
+    def get(self,digest,dest_path):
+        # Copies cached content to 'dest_path', tools modify their DBs in place so hardlinks are not an option
+        if not os.path.isfile(self.blobPath(digest)):
+            return False
+        shutil.copyfile(self.blobPath(digest),dest_path + ".part")
+        os.replace(dest_path + ".part",dest_path)
+        os.utime(self.blobPath(digest))
+        return True
+
+    def getChanges(self,digest):
+        if not os.path.isfile(self.blobPath(digest) + ".changes"):
+            return None
+        with open(self.blobPath(digest) + ".changes","rb") as changes_file:
+            return changes_file.read()
+
+    def put(self,src_path,digest=None,changes=None):
+        # Stores a copy of 'src_path', content not matching the expected digest is not cached
+        os.makedirs(str(self.cache_dir),exist_ok=True)
+        tmp_path = self.blobPath(f".incoming-{threading.get_ident()}")
+        hasher = hashlib.sha256()
+        with open(src_path,"rb") as src_file, open(tmp_path,"wb") as tmp_file:
+            while True:
+                block = src_file.read(transfer_chunk_size)
+                if not block:
+                    break
+                hasher.update(block)
+                tmp_file.write(block)
+        if digest and hasher.hexdigest() != digest:
+            os.remove(tmp_path)
+            return None
+        digest = hasher.hexdigest()
+        os.replace(tmp_path,self.blobPath(digest))
+        if changes is not None:
+            with open(self.blobPath(digest) + ".changes","wb") as changes_file:
+                changes_file.write(changes)
+        self.evict()
+        return digest
+
+    def evict(self):
+        with self.lock:
+            self.evictLocked()
+
+    def evictLocked(self):
+        blobs = []
+        total_size = 0
+        for entry in os.scandir(str(self.cache_dir)):
+            if entry.is_file():
+                total_size += entry.stat().st_size
+                if "." not in entry.name:
+                    blobs.append(entry)
+        for entry in sorted(blobs,key=lambda blob: blob.stat().st_mtime):
+            if total_size <= self.max_size:
+                break
+            for blob_file in [entry.path,entry.path + ".changes"]:
+                if os.path.exists(blob_file):
+                    total_size -= os.path.getsize(blob_file)
+                    os.remove(blob_file)
+
+
+class Quarantine:
+    # Local copies of items removed from the project are moved here instead of being deleted right away
+    # Oldest entries are deleted once the quarantine grows over 'max_size'
+    def __init__(self,quarantine_dir,max_size):
+        self.quarantine_dir = quarantine_dir
+        self.max_size = max_size
+        self.lock = threading.Lock()
+
+    def put(self,fs_path,path):
+        # 'path' is the manifest path of the item, kept in the name of the entry
+        if not os.path.exists(fs_path):
+            return
+        os.makedirs(str(self.quarantine_dir),exist_ok=True)
+        entry = os.path.join(str(self.quarantine_dir),f"{time.time_ns()}-{threading.get_ident()}")
+        os.makedirs(entry)
+        os.replace(fs_path,os.path.join(entry,"__".join(path)))
+
+    def entrySize(self,entry_path):
+        total_size = 0
+        for directory, subdirectories, file_names in os.walk(entry_path):
+            for file_name in file_names:
+                try:
+                    total_size += os.path.getsize(os.path.join(directory,file_name))
+                except OSError:
+                    pass
+        return total_size
+
+    def evict(self):
+        with self.lock:
+            if not os.path.isdir(str(self.quarantine_dir)):
+                return
+            entries = sorted(os.scandir(str(self.quarantine_dir)),key=lambda entry: entry.name,reverse=True)
+            total_size = 0
+            for entry in entries:
+                total_size += self.entrySize(entry.path)
+                if total_size > self.max_size:
+                    shutil.rmtree(entry.path,ignore_errors=True)
+
+def which(program,search_path):
+    # Search for programs in path
+    def is_exe(fpath):
+        return os.path.isfile(fpath) and os.access(fpath, os.X_OK)
+    for path in search_path.split(os.pathsep):
+        exe_file = os.path.join(path, program)
+        if is_exe(exe_file):
+            return exe_file
+        exe_file = os.path.join(path, f"{program}.exe")
+        if is_exe(exe_file):
+            return exe_file
+        exe_file = os.path.join(path, f"{program}.bat")
+        if is_exe(exe_file):
+            return exe_file
+    return None
+
+class ToolRegistry:
+    # Resolved executables of the supported tools, PATH is scanned once and again only after it changed
+    tools = ["ida64","ida","binaryninja","Hopper","Cutter","ghidraRun","analyzeHeadless","jeb","jadx","android-studio"]
+    # Tool that opens each DB type
+    db_tools = {"i64":"ida64","idb":"ida","bndb":"binaryninja","hop":"Hopper","rzdb":"Cutter","ghdb":"ghidraRun","jdb2":"jeb","asp":"android-studio"}
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.search_path = None
+        self.executables = {}
+
+    def scan(self):
+        with self.lock:
+            search_path = os.environ.get("PATH","")
+            self.executables = {tool: which(tool,search_path) for tool in self.tools}
+            self.search_path = search_path
+
+    def resolve(self,tool):
+        # Full path of the tool executable or None, also None until the first scan finished (it runs in the background)
+        if self.search_path is not None and os.environ.get("PATH","") != self.search_path:
+            self.scan()
+        return self.executables.get(tool)
+
+    def isAvailable(self,tool):
+        # Tools count as available until the first scan finished, updateToolAvailability follows it
+        return self.search_path is None or self.resolve(tool) is not None
+
+    def executable(self,tool):
+        # What to run for the tool, the bare name when it was not found (the batch files on Windows)
+        resolved = self.resolve(tool)
+        if resolved:
+            return resolved
+        if os.name == "nt" and tool in ["jeb","ghidraRun","analyzeHeadless"]:
+            return f"{tool}.bat"
+        return tool
+
+    def hasDBTool(self,db_name):
+        return db_name in self.db_tools and self.isAvailable(self.db_tools[db_name])
+
+class EventListener(QObject):
+    # Follows the '/events' server-sent events stream of the open project in a background thread
+    # Every 'manifest' event is delivered on the GUI thread through the 'changes' signal, 'resync' asks for a full refresh
+    changes = pyqtSignal(str,object)
+    resync = pyqtSignal(str)
+
+    def __init__(self,client,project,revision,timeout):
+        super(EventListener, self).__init__()
+        self.client = client
+        self.project = project
+        self.revision = revision
+        self.timeout = timeout
+        self.stopped = threading.Event()
+        self.response = None
+        self.thread = threading.Thread(target=self.run,daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        response = self.response
+        if response is not None:
+            # Unblocks the read in the listener thread
+            response.close()
+
+    def run(self):
+        failures = 0
+        while not self.stopped.is_set():
+            try:
+                params = self.client.manifestParams({"project":self.project})
+                if self.revision is not None:
+                    params["since"] = self.revision
+                self.response = self.client.session.get(f'{self.client.server}/events', params=params, stream=True, timeout=(self.client.timeout[0],self.timeout), headers={"Accept":"text/event-stream"})
+                if self.response.status_code != 200:
+                    raise requests.exceptions.ConnectionError()
+                failures = 0
+                event, data = None, []
+                for line in self.response.iter_lines(decode_unicode=True):
+                    if self.stopped.is_set():
+                        break
+                    if line:
+                        # Lines starting with ':' are keep-alive comments
+                        if line.startswith("event:"):
+                            event = line[6:].strip()
+                        elif line.startswith("data:"):
+                            data.append(line[5:].strip())
+                        continue
+                    if event == "manifest":
+                        payload = json.loads("\n".join(data))
+                        self.revision = payload["revision"]
+                        self.changes.emit(self.project,payload)
+                    elif event == "resync":
+                        self.revision = None
+                        self.resync.emit(self.project)
+                    event, data = None, []
+            except Exception:
+                failures += 1
+            if not self.stopped.is_set():
+                # Reconnect, backing off while the server is unreachable
+                self.stopped.wait(min(60,2 ** min(failures,6)))
+
+class TaskError(Exception):
+    # Raised by background tasks to report the error to the user with the given message box
+    def __init__(self,title,text):
+        super(TaskError, self).__init__(text)
+        self.title = title
+        self.text = text
+
+class TaskSignals(QObject):
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(object)
+    progress = pyqtSignal(object)
+
+class Task(QRunnable):
+    # Runs 'work' in the thread pool, the result (or exception) is delivered to the GUI thread with signals
+    # Work that reports progress gets the function emitting the progress signal as its only argument
+    def __init__(self,work,reports_progress=False):
+        super(Task, self).__init__()
+        self.work = work
+        self.reports_progress = reports_progress
+        self.signals = TaskSignals()
+
+    def run(self):
+        try:
+            result = self.work(self.signals.progress.emit) if self.reports_progress else self.work()
+        except Exception as error:
+            self.signals.failed.emit(error)
+            return
+        self.signals.finished.emit(result)
+
+
+def tree_entries(value):
+    # Children shown in the project tree for a manifest folder, sorted by name
+    entries = []
+    for key, val in sorted(value.items()):
+        if key == "__file__type__" or key == "__locked__" or  key == "__rev_dbs__" or type(val) is not dict:
+            continue
+        entries.append((key,val))
+    return entries
+
+class TreeNode:
+    # Node of the project tree, offers the parts of the QTreeWidgetItem interface the rest of the client uses
+    # 'children' stays None until the node is expanded for the first time
+    __slots__ = ["name","kind","status","disabled","value","parentNode","children","row","path"]
+
+    def __init__(self,name,kind,value,parentNode,row):
+        self.name = name
+        self.path = parentNode.path + (name,) if parentNode is not None else ()
+        self.kind = kind
+        self.status = ""
+        self.disabled = False
+        self.value = value
+        self.parentNode = parentNode
+        self.children = None
+        self.row = row
+
+    def text(self,column):
+        return self.name if column == 0 else self.status
+
+    def whatsThis(self,column):
+        return self.kind
+
+    def parent(self):
+        # Top level items have no parent, same as QTreeWidgetItem
+        if self.parentNode is None or self.parentNode.parentNode is None:
+            return None
+        return self.parentNode
+
+    def child(self,index):
+        return self.children[index]
+
+    def childCount(self):
+        return len(self.children) if self.children is not None else 0
+
+    def isDisabled(self):
+        return self.disabled
+
+class ProjectModel(QAbstractItemModel):
+    # Model over the project manifest, child nodes are created only when their parent is expanded
+    def __init__(self,window):
+        super(ProjectModel, self).__init__()
+        self.window = window
+        self.root = TreeNode("","",{},None,0)
+        self.root.children = []
+
+    def nodeFor(self,index):
+        return index.internalPointer() if index.isValid() else self.root
+
+    def indexFor(self,node):
+        if node is self.root:
+            return QModelIndex()
+        return self.createIndex(node.row,0,node)
+
+    def index(self,row,column,parent=QModelIndex()):
+        node = self.nodeFor(parent)
+        if node.children is None or row < 0 or row >= len(node.children):
+            return QModelIndex()
+        return self.createIndex(row,column,node.children[row])
+
+    def parent(self,index):
+        if not index.isValid():
+            return QModelIndex()
+        return self.indexFor(index.internalPointer().parentNode)
+
+    def rowCount(self,parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        return self.nodeFor(parent).childCount()
+
+    def columnCount(self,parent=QModelIndex()):
+        return 2
+
+    def hasChildren(self,parent=QModelIndex()):
+        node = self.nodeFor(parent)
+        if node.children is not None:
+            return len(node.children) > 0
+        if node.kind == "binary":
+            return len(node.value["__rev_dbs__"]) > 0
+        return any(type(val) is dict and key != "__rev_dbs__" for key, val in node.value.items())
+
+    def canFetchMore(self,parent):
+        return self.nodeFor(parent).children is None
+
+    def fetchMore(self,parent):
+        node = self.nodeFor(parent)
+        if node.children is not None:
+            return
+        children = self.buildChildren(node)
+        if not children:
+            node.children = []
+            return
+        self.beginInsertRows(parent,0,len(children) - 1)
+        node.children = children
+        self.endInsertRows()
+
+    def buildChildren(self,node):
+        if node.kind == "binary":
+            return [self.makeRevDBNode(rev_db,rev_db_value,node,row) for row, (rev_db, rev_db_value) in enumerate(node.value["__rev_dbs__"].items())]
+        return [self.makeNode(key,val,node,row) for row, (key, val) in enumerate(tree_entries(node.value))]
+
+    def makeNode(self,name,value,parentNode,row):
+        if value["__file__type__"] == True:
+            kind = "binary"
+        elif value["__file__type__"] == False:
+            kind = "folder"
+        else:
+            kind = ""
+        return TreeNode(name,kind,value,parentNode,row)
+
+    def makeRevDBNode(self,rev_db,value,parentNode,row):
+        node = TreeNode(rev_db,"db",value,parentNode,row)
+        node.disabled = not self.window.doesToolExist(rev_db)
+        if value['checked-out']:
+            node.status = f"Checked-out by '{value['checked-out']}'"
+        return node
+
+    def data(self,index,role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        if role == Qt.DisplayRole:
+            return node.text(index.column())
+        if role == Qt.DecorationRole and index.column() == 0 and node.kind:
+            return self.window.treeIcon(node.name if node.kind == "db" else node.kind)
+        return None
+
+    def headerData(self,section,orientation,role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return ["File","Status"][section]
+        return None
+
+    def flags(self,index):
+        if not index.isValid():
+            return Qt.ItemIsDropEnabled
+        if index.internalPointer().disabled:
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsDragEnabled | Qt.ItemIsDropEnabled
+
+    def updateToolAvailability(self):
+        # Re-evaluates the disabled state of the DB nodes that exist
+        pending = [self.root]
+        while pending:
+            node = pending.pop()
+            if node.children is None:
+                continue
+            for child in node.children:
+                if child.kind == "db":
+                    disabled = not self.window.doesToolExist(child.name)
+                    if disabled != child.disabled:
+                        child.disabled = disabled
+                        self.dataChanged.emit(self.createIndex(child.row,0,child),self.createIndex(child.row,1,child))
+                else:
+                    pending.append(child)
+
+    def renumber(self,node,start=0):
+        for row in range(start,len(node.children)):
+            node.children[row].row = row
+
+    def sync(self,manifest,paths=None):
+        # Reconciles the nodes with the manifest by name, returns the top level nodes that were created
+        # With 'paths' (manifest changes applied in place) only the entries that own the changes are visited, otherwise
+        # all built nodes whose value is not the same object as before
+        if paths is None:
+            self.root.value = manifest
+            return self.syncNode(self.root,manifest)
+        created = []
+        targets = set()
+        for path in paths:
+            # Changes below a '__' field ('__rev_dbs__', '__locked__', ...) belong to the entry before it, others to their parent
+            position = next((position for position, name in enumerate(path) if name.startswith("__")),len(path) - 1)
+            targets.add(tuple(path[:position]))
+        for target in targets:
+            # Deepest built node on the way, anything below it is reconciled from its value
+            node, value = self.root, manifest
+            for name in target:
+                if node.children is None or type(value.get(name)) is not dict:
+                    break
+                child = next((child for child in node.children if child.name == name),None)
+                if child is None:
+                    break
+                node, value = child, value[name]
+            if node.children is None:
+                # Not expanded, only whether it has children may have changed
+                node.value = value
+                if node is not self.root:
+                    self.dataChanged.emit(self.indexFor(node),self.indexFor(node))
+                continue
+            created += [child for child in self.syncNode(node,value) if node is self.root]
+        return created
+
+    def syncNode(self,node,value):
+        node.value = value
+        if node.children is None:
+            # Not expanded yet, children are built from 'value' once needed
+            return []
+        if node.kind == "binary":
+            self.syncRevDBNodes(node,value["__rev_dbs__"])
+            return []
+        parent = self.indexFor(node)
+        entries = tree_entries(value)
+        names = set(key for key, val in entries)
+        for row in reversed(range(len(node.children))):
+            if node.children[row].name not in names:
+                self.beginRemoveRows(parent,row,row)
+                del node.children[row]
+                self.endRemoveRows()
+        self.renumber(node)
+        existing = {child.name: child for child in node.children}
+        created = []
+        for row, (key, val) in enumerate(entries):
+            child = existing.get(key)
+            if child is None:
+                child = self.makeNode(key,val,node,row)
+                self.beginInsertRows(parent,row,row)
+                node.children.insert(row,child)
+                self.renumber(node,row)
+                self.endInsertRows()
+                created.append(child)
+                continue
+            if child.value is val:
+                # Manifest changes replace the changed entries, so the same object means nothing changed in this subtree
+                continue
+            kind = self.makeNode(key,val,node,row).kind
+            if kind != child.kind:
+                # Binary replaced folder or the other way around
+                self.beginRemoveRows(parent,row,row)
+                del node.children[row]
+                self.endRemoveRows()
+                child = self.makeNode(key,val,node,row)
+                self.beginInsertRows(parent,row,row)
+                node.children.insert(row,child)
+                self.endInsertRows()
+                continue
+            self.syncNode(child,val)
+        return created
+
+    def syncRevDBNodes(self,node,rev_dbs):
+        parent = self.indexFor(node)
+        for row in reversed(range(len(node.children))):
+            if node.children[row].name not in rev_dbs:
+                self.beginRemoveRows(parent,row,row)
+                del node.children[row]
+                self.endRemoveRows()
+        self.renumber(node)
+        existing = {child.name: child for child in node.children}
+        for row, rev_db in enumerate(rev_dbs):
+            rev_db_node = existing.get(rev_db)
+            if rev_db_node is None:
+                self.beginInsertRows(parent,row,row)
+                node.children.insert(row,self.makeRevDBNode(rev_db,rev_dbs[rev_db],node,row))
+                self.renumber(node,row)
+                self.endInsertRows()
+                continue
+            rev_db_node.value = rev_dbs[rev_db]
+            checked_out = rev_dbs[rev_db]['checked-out']
+            status = f"Checked-out by '{checked_out}'" if checked_out else ""
+            if rev_db_node.status != status:
+                rev_db_node.status = status
+                self.dataChanged.emit(self.createIndex(rev_db_node.row,1,rev_db_node),self.createIndex(rev_db_node.row,1,rev_db_node))
+
+class ProjectTree(QTreeView):
     def __init__(self, parent,window):
         super(ProjectTree, self).__init__(parent)
         self.setMouseTracking(True)
         self.setAcceptDrops(True)
+        self.setUniformRowHeights(True)
         self.window = window
+        self.setModel(ProjectModel(window))
 
-    def setProjectData(self,server,projectName,username,password,cert,parent):
-        self.server = server
+    def setProjectData(self,client,projectName,parent):
+        self.client = client
         self.projectName = projectName
-        self.username = username
-        self.password = password
-        self.cert = cert
         self.parent = parent
 
     def dragEnterEvent(self, event):
+        if not self.window.connected:
+            # Project shown from the snapshot cannot be changed
+            event.ignore()
+            return
         event.accept()
 
+    def itemAt(self,pos):
+        index = self.indexAt(pos)
+        return index.internalPointer() if index.isValid() else None
+
+    def currentItem(self):
+        index = self.currentIndex()
+        return index.internalPointer() if index.isValid() else None
+
+    def selectedItems(self):
+        return [index.internalPointer() for index in self.selectionModel().selectedRows()]
+
+    def selectItem(self,item):
+        self.selectionModel().select(self.model().indexFor(item),QItemSelectionModel.Select | QItemSelectionModel.Rows)
+
     def deselectAll(self):
-        for item in self.selectedItems():
-            item.setSelected(False)
+        self.selectionModel().clearSelection()
 
     def dragMoveEvent(self, event):
         event.accept()
@@ -44,15 +1452,15 @@ class ProjectTree(QTreeWidget):
             if item.whatsThis(0) == "binary":
                 # Highlight parent folder
                 self.deselectAll()
-                item.parent().setSelected(True)
+                self.selectItem(item.parent())
             elif item.whatsThis(0) == "folder":
                 # Highlight current folder
                 self.deselectAll()
-                item.setSelected(True)
+                self.selectItem(item)
             else:
                 # Higlight parent of parent (for cases where we hover over DB files listing)
                 self.deselectAll()
-                item.parent().parent().setSelected(True)
+                self.selectItem(item.parent().parent())
 
 
     def showPopupBox(self,title,text,icon):
@@ -66,79 +1474,132 @@ class ProjectTree(QTreeWidget):
         return ["*"]
 
     def uploadFile(self,fsPath,remotePath):
-        self.window.start_task("Uploading file ... ")
-        with open(fsPath, "rb") as data_file:
-            encoded_file = base64.b64encode(data_file.read()).decode("utf-8") 
-        values = {'path': remotePath,"project":self.projectName,"file":encoded_file,"file_name":os.path.basename(fsPath)}
-        try:
-            response = requests.post(f'{self.server}/push', json=values, auth=(self.username, self.password), verify=self.cert, timeout=(3,40))
-            if response.status_code != 200:
-                self.showPopupBox("Error Uploading File","Something went horribly wrong!",QMessageBox.Critical)
-            elif response.text == "FILE_ALREADY_EXISTS":
+        def done(error):
+            if error == "file already exists":
                 self.showPopupBox("Error Uploading File","File already exists!",QMessageBox.Critical)
+            elif error:
+                self.showPopupBox("Error Uploading File","Something went horribly wrong!",QMessageBox.Critical)
             self.parent.refreshProject()
-        except:
-            self.showPopupBox("Connection Error","Connection to the server is not working!",QMessageBox.Critical)
-            self.window.end_task()
-            return
-        self.window.end_task()
-            
+        project = self.projectName
+        self.window.runTask("Uploading file ... ",lambda: self.pushFile(project,fsPath,remotePath,raise_errors=True),done)
 
     def uploadDir(self,fs_path,path):
-        self.window.start_task("Uploading directory ... ")
         if not re.match(r'^\w+$',os.path.basename(fs_path)):
             self.showPopupBox("Invalid Folder Name",f"Folder name can contain only letters, numbers and '_' (underscores). Failed with: {os.path.basename(fs_path)}",QMessageBox.Critical)
-            self.window.end_task()
             return 
-        for directory, subdirectories, files in os.walk(fs_path):
-            for d in subdirectories:
-                if not re.match(r'^\w+$',d):
-                    self.showPopupBox("Invalid Folder Name",f"Folder name can contain only letters, numbers and '_' (underscores). Failed with: {d}",QMessageBox.Critical)
-                    self.window.end_task()
-                    return 
-        # Creates the initial dir
-        self.mkdir(path,os.path.basename(fs_path))
+        # Single pass over the local folder that validates names and plans folders (parents first) and files to upload
+        folders = [(path,os.path.basename(fs_path))]
+        files = []
         # Base path used to get rid of the fs_path elements
         base_path_len = len(os.path.normpath(fs_path).split(os.path.sep))
-        for directory, subdirectories, files in os.walk(fs_path):
+        for directory, subdirectories, file_names in os.walk(fs_path):
             current_path = path + (os.path.normpath(directory).split(os.path.sep)[base_path_len-1:])
             for d in subdirectories:
-                self.mkdir(current_path,d)
-            for f in files:
-                self.uploadFile(os.path.join(directory,f),current_path)
-        self.window.end_task()
-
+                if not re.match(r'^\w+$',d):
+                    self.showPopupBox("Invalid Folder Name",f"Folder name can contain only letters, numbers and '_' (underscores). Failed with: {d}",QMessageBox.Critical)
+                    return 
+                folders.append((current_path,d))
+            for f in file_names:
+                files.append((os.path.join(directory,f),current_path))
+        progress = QProgressDialog("Uploading files ...","Cancel",0,len(files),self)
+        cancelled = threading.Event()
+        progress.canceled.connect(cancelled.set)
+        project = self.projectName
+        def work(report):
+            return self.createFolders(project,folders) + self.uploadFiles(project,files,report,cancelled)
+        def done(failures):
+            progress.close()
+            self.parent.refreshProject()
+            if failures:
+                details = "\n".join(failures[:20])
+                if len(failures) > 20:
+                    details += f"\n... and {len(failures) - 20} more"
+                self.showPopupBox("Error Uploading Directory",f"Some items could not be uploaded:\n{details}",QMessageBox.Critical)
+        def error(exception):
+            progress.close()
+            self.showPopupBox("Connection Error","Connection to the server is not working!",QMessageBox.Critical)
+        self.window.runTask("Uploading directory ... ",work,done,error,progress.setValue)
 
-    def mkdir(self,path,dirname):
-        # Create directory
-        if not re.match(r'^\w+$',dirname):
-            self.showPopupBox("Invalid Folder Name","Folder name can contain only letters, numbers and '_' (underscores).",QMessageBox.Critical)
-            return
-        data = {
-            "project":self.projectName,
-            "path": path,
-            "dirname": dirname
-        }
-        try:
-            response = requests.post(f'{self.server}/mkdir', json=data, auth=(self.username, self.password), verify=self.cert, timeout=(3,40))
+    def createFolders(self,project,folders):
+        # Creates folders of the upload plan in one request if the server supports it, returns list of failures
+        if "mkdirs" in self.client.capabilities:
+            data = {
+                "project":project,
+                "folders": [{"path": path,"dirname": dirname} for path, dirname in folders]
+            }
+            try:
+                response = self.client.post("mkdirs", json=data)
+            except:
+                return ["Connection to the server is not working!"]
             if response.status_code != 200:
-                self.showPopupBox("Error Creating Folder","Something went horribly wrong!",QMessageBox.Critical)
-            elif response.text == "FOLDER_ALREADY_EXISTS":
-                self.showPopupBox("Error Creating Folder","Folder with this name already exists!",QMessageBox.Critical)
-            self.parent.refreshProject()
+                return ["Creating folders failed!"]
+            statuses = response.json()["status"]
+        else:
+            statuses = []
+            for path, dirname in folders:
+                data = {
+                    "project":project,
+                    "path": path,
+                    "dirname": dirname
+                }
+                try:
+                    response = self.client.post("mkdir", json=data)
+                except:
+                    return ["Connection to the server is not working!"]
+                statuses.append(response.text if response.status_code == 200 else "ERROR")
+        failures = []
+        for (path, dirname), status in zip(folders,statuses):
+            if status == "FOLDER_ALREADY_EXISTS":
+                failures.append(f"{'/'.join(path + [dirname])}: folder already exists")
+            elif status == "ERROR":
+                failures.append(f"{'/'.join(path + [dirname])}: folder could not be created")
+        return failures
+
+    def uploadFiles(self,project,files,report,cancelled):
+        # Uploads files with a bounded pool of workers, reports number of finished uploads and returns list of failures
+        failures = []
+        with ThreadPoolExecutor(max_workers=self.parent.settings["upload_workers"]) as executor:
+            pending = {executor.submit(self.pushFile,project,fs_path,remote_path): fs_path for fs_path, remote_path in files}
+            while pending:
+                done, _ = wait(pending,timeout=0.1,return_when=FIRST_COMPLETED)
+                for future in done:
+                    error = future.result()
+                    if error:
+                        failures.append(f"{pending[future]}: {error}")
+                    del pending[future]
+                report(len(files) - len(pending))
+                if cancelled.is_set():
+                    for future in list(pending):
+                        if future.cancel():
+                            failures.append(f"{pending.pop(future)}: upload cancelled")
+        return failures
+
+    def pushFile(self,project,fs_path,remote_path,raise_errors=False):
+        # Runs in background workers so it must not touch the UI, returns description of the error or None
+        values = {'path': remote_path,"project":project,"file_name":os.path.basename(fs_path)}
+        try:
+            response = self.client.upload("push",fs_path,values)
+        except ChecksumError:
+            if raise_errors:
+                raise
+            return "checksum of the uploaded file does not match"
         except:
-            self.showPopupBox("Connection Error","Connection to the server is not working!",QMessageBox.Critical)
-            return
+            if raise_errors:
+                raise
+            return "connection to the server is not working"
+        if response.status_code != 200:
+            return "something went horribly wrong"
+        elif response.text == "FILE_ALREADY_EXISTS":
+            return "file already exists"
+        return None
+
 
     def getPathToRoot(self,treeItem):
-        path = [treeItem.text(0)]
-        tmpItem = treeItem
-        while tmpItem.parent():
-            tmpItem = tmpItem.parent()
-            path.insert(0, tmpItem.text(0))
-        return path
+        return list(treeItem.path)
 
     def dropEvent(self, event):
+        if not self.window.connected:
+            return
         # External source
         if event.mimeData().hasUrls():
             for url in event.mimeData().urls():
@@ -182,21 +1643,17 @@ class ProjectTree(QTreeWidget):
                             "source_path": self.getPathToRoot(source_item),
                             "dest_path": self.getPathToRoot(dest_item) if len(self.getPathToRoot(dest_item)) > 0 else [self.projectName]
                         }
-                        try:
-                            response = requests.post(f'{self.server}/move', json=data, auth=(self.username, self.password), verify=self.cert, timeout=(3,40))
-                        except:
-                            self.showPopupBox("Connection Error","Connection to the server is not working!",QMessageBox.Critical)
-                            return
-                        if response.text == "DONE":
-                            #if os.path.exists(os.path.join(str(collare_home),*self.getPathToRoot(source_item))):
-                                #shutil.move(os.path.join(str(collare_home),*self.getPathToRoot(source_item)),os.path.join(str(collare_home),*self.getPathToRoot(dest_item)))
-                            self.parent.refreshProject()
-                        elif response.text == "CHECKEDOUT_FILE":
-                            self.showPopupBox("Cannot move DB item","One of the items intended to move are checked-out.",QMessageBox.Critical)
-                            return
-                        elif response.text == "ALREADY_EXISTS":
-                            self.showPopupBox("Cannot move DB item","Item with this name already exists in destination.",QMessageBox.Critical)
-                            return
+                        def done(response):
+                            if response.text == "DONE":
+                                self.parent.applyOptimisticChanges([{"path":data["source_path"],"value":None},{"path":data["dest_path"] + data["source_path"][-1:],"value":self.parent.manifestIndex.get(data["source_path"]).value}])
+                                #if os.path.exists(os.path.join(str(collare_home),*self.getPathToRoot(source_item))):
+                                    #shutil.move(os.path.join(str(collare_home),*self.getPathToRoot(source_item)),os.path.join(str(collare_home),*self.getPathToRoot(dest_item)))
+                                self.parent.refreshProject(response)
+                            elif response.text == "CHECKEDOUT_FILE":
+                                self.showPopupBox("Cannot move DB item","One of the items intended to move are checked-out.",QMessageBox.Critical)
+                            elif response.text == "ALREADY_EXISTS":
+                                self.showPopupBox("Cannot move DB item","Item with this name already exists in destination.",QMessageBox.Critical)
+                        self.window.runTask("Moving item ... ",lambda: self.client.post("move", json=data),done)
                     else:
                         self.showPopupBox("Cannot move DB item","Only binaries and folders can be moved within the project tree. Not the individual DBs.",QMessageBox.Critical)
 
@@ -211,11 +1668,82 @@ class Ui_Dialog(object):
                 self.serverText.setText(connection_data["server"])
                 self.usernameText.setText(connection_data["username"])
                 self.serverCertPathText.setText(connection_data["cert"])
+                if connection_data.get("project"):
+                    self.openOfflineProject(connection_data["project"])
 
     def storeConnectionDetails(self,server,username,cert):
         # Store connection details
+        connection_data = {}
+        if os.path.exists(str(collare_home / "connection.json")):
+            with open(str(collare_home / "connection.json"),"r") as connection_file:
+                connection_data = json.load(connection_file)
+        connection_data.update({"username":username,"server":server,"cert":cert})
         with open(str(collare_home / "connection.json"),"w") as connection_file:
-            json.dump({"username":username,"server":server,"cert":cert}, connection_file)
+            json.dump(connection_data, connection_file)
+
+    def storeLastProject(self,project):
+        # Project shown at the next start before connecting
+        if os.path.exists(str(collare_home / "connection.json")):
+            with open(str(collare_home / "connection.json"),"r") as connection_file:
+                connection_data = json.load(connection_file)
+            connection_data["project"] = project
+            with open(str(collare_home / "connection.json"),"w") as connection_file:
+                json.dump(connection_data, connection_file)
+
+    def openOfflineProject(self,project):
+        # Shows the last known state of the project from its snapshot, local DBs can be opened read-only until connected
+        def work():
+            snapshot = load_snapshot(project)
+            if snapshot is None:
+                return None
+            return snapshot, ManifestIndex(snapshot["manifest"])
+        def done(result):
+            if result is None or self.currentProject:
+                # No snapshot or a project was opened from the server in the meantime
+                return
+            snapshot, index = result
+            self.currentProject = project
+            self.currentProjectManifest = snapshot["manifest"]
+            self.currentProjectRevision = snapshot["revision"]
+            self.manifestIndex = index
+            self.projectTab.setEnabled(True)
+            self.mainTabWidget.setCurrentIndex(1)
+            self.refreshProjectTree()
+        self.runTask("Loading last project ... ",work,done,lambda exception: None)
+
+    def resumeProject(self):
+        # Project shown from the snapshot is brought up to date once connected, usually by a manifest delta
+        self.frame_6.setEnabled(True)
+        self.projectTab.setEnabled(True)
+        self.projectTreeView.setProjectData(self.client,self.currentProject,self)
+        self.currentProjectLocalPath = Path(collare_home / self.currentProject)
+        self.currentProjectLocalPath.mkdir(exist_ok=True)
+        self.startEvents()
+        self.populateCurrentProjectUserListing()
+        self.refreshProject()
+
+    def saveSnapshot(self):
+        # Saves are collected for 'snapshot_delay_ms' so that a burst of changes writes the snapshot once
+        if self.connected and self.currentProject:
+            self.snapshotTimer.start(self.settings["snapshot_delay_ms"])
+
+    def writeSnapshot(self):
+        # Snapshot has to match its revision, so it is not saved while unverified local changes are shown
+        if not self.connected or not self.currentProject or self.optimisticChanges:
+            return
+        if self.snapshotInFlight:
+            # Written again with the latest manifest once the current save finishes
+            self.snapshotPending = True
+            return
+        self.snapshotInFlight = True
+        project, revision = self.currentProject, self.currentProjectRevision
+        manifest_json = json.dumps(self.currentProjectManifest)
+        def finished(result=None):
+            self.snapshotInFlight = False
+            if self.snapshotPending:
+                self.snapshotPending = False
+                self.writeSnapshot()
+        self.runTask("Saving project snapshot ... ",lambda: save_snapshot(project,manifest_json,revision),finished,finished)
 
     def showPopupBox(self,title,text,icon):
         msg = QMessageBox(self)
@@ -225,37 +1753,42 @@ class Ui_Dialog(object):
         x = msg.exec_()
     
     def start_task(self,title):
-        self.projectTab.setEnabled(False)
+        # Tasks run in the background and may overlap, the label shows the most recent one that is still running
+        self.activeTasks.append(title)
         self.progress_label.setText(title)
-        loop = QEventLoop()
-        QTimer.singleShot(1000, loop.quit)
-        loop.exec_()
 
-    def end_task(self):
-        self.projectTab.setEnabled(True)
-        self.progress_label.setText("")
-
-    def which(self,program):
-        # Search for programs in path
-        def is_exe(fpath):
-            return os.path.isfile(fpath) and os.access(fpath, os.X_OK)
-        fpath, fname = os.path.split(program)
-        if fpath:
-            if is_exe(program):
-                return program
-        else:
-            for path in os.environ["PATH"].split(os.pathsep):
-                exe_file = os.path.join(path, program)
-                if is_exe(exe_file):
-                    return exe_file
-                exe_file = os.path.join(path, f"{program}.exe")
-                if is_exe(exe_file):
-                    return exe_file
-                exe_file = os.path.join(path, f"{program}.bat")
-                if is_exe(exe_file):
-                    return exe_file
-
-        return None
+    def end_task(self,title):
+        self.activeTasks.remove(title)
+        self.progress_label.setText(self.activeTasks[-1] if self.activeTasks else "")
+
+    def runTask(self,title,work,done=None,error=None,progress=None):
+        # Runs 'work' in the thread pool so that the UI stays responsive, 'done' gets the result and 'error' the raised
+        # exception on the GUI thread. Errors are reported with a message box unless 'error' is given.
+        task = Task(work,progress is not None)
+        # Keep the task referenced until its signals are delivered
+        self.tasks.add(task)
+        self.start_task(title)
+        def finished(result):
+            self.tasks.discard(task)
+            self.end_task(title)
+            if done:
+                done(result)
+        def failed(exception):
+            self.tasks.discard(task)
+            self.end_task(title)
+            if error:
+                error(exception)
+            elif isinstance(exception,TaskError):
+                self.showPopupBox(exception.title,exception.text,QMessageBox.Critical)
+            elif isinstance(exception,ChecksumError):
+                self.showPopupBox("Transfer Error",f"{exception}, please try again!",QMessageBox.Critical)
+            else:
+                self.showPopupBox("Connection Error","Connection to the server is not working!",QMessageBox.Critical)
+        task.signals.finished.connect(finished)
+        task.signals.failed.connect(failed)
+        if progress:
+            task.signals.progress.connect(progress)
+        QThreadPool.globalInstance().start(task)
 
     def onSuccessConnect(self):
         # Do UI changes upon connection
@@ -272,11 +1805,16 @@ class Ui_Dialog(object):
         self.existingProjectFrame.setEnabled(True)
         self.populateAllUserListings()
         self.populateExistingProjects()
+        if self.currentProject:
+            self.resumeProject()
         #self.projectTab.setEnabled(True)
     
     def onDisconnect(self):
         # Do UI changes upon disconnect
         self.connected = False
+        self.stopEvents()
+        if self.client:
+            self.client.close()
         self.connectStatusLabel.setText("Disconnected")
         self.connectStatusLabel.setStyleSheet("color: black")
         self.passwordText.setDisabled(False)
@@ -292,13 +1830,8 @@ class Ui_Dialog(object):
         #self.projectTab.setEnabled(False)
 
     def getPathToRoot(self,treeItem):
-        # Traces the path to root of the manifest file
-        path = [treeItem.text(0)]
-        tmpItem = treeItem
-        while tmpItem.parent():
-            tmpItem = tmpItem.parent()
-            path.insert(0, tmpItem.text(0))
-        return path
+        # Path of the item in the manifest, tree nodes know it from the time they were created
+        return list(treeItem.path)
 
     def addFolderToZip(self, zip_file, folder,strip_path):
         # Adds folder to zip file (used to handle Ghidra projects)
@@ -309,118 +1842,173 @@ class Ui_Dialog(object):
             elif os.path.isdir(full_path):
                 self.addFolderToZip(zip_file, full_path,strip_path)
 
-    def autoRemoveDirs(self):
-        # Automatically remove directories that are not matching anything in current manifest
-        # This means that local files reflect state before someone else deleted something
-        mag = [self.currentProjectManifest[self.currentProject]]
-        path_mag = [os.path.join(str(collare_home),self.currentProject)]
-        while mag:
-            current_folder = mag.pop()
-            current_fs_path = path_mag.pop()
+    def sweepWorkspace(self,project,index):
+        # Full pass over the local copy of the project, used once when a project is opened as there is no known previous state
+        # Runs in the background, items that are not in the manifest go to the quarantine
+        pending = [(index.get([project]),[project])]
+        while pending:
+            node, path = pending.pop()
+            current_fs_path = os.path.join(str(collare_home),*path)
+            if node is None or not os.path.isdir(current_fs_path):
+                continue
             for fs_item in os.listdir(current_fs_path):
-                if not fs_item in current_folder.keys():# and not current_folder[fs_item]["__file__type__"]:
-                    # Delete only folders as those are reflected in manifest file immediatelly 
-                    shutil.rmtree(os.path.join(current_fs_path,fs_item))
-                elif not current_folder[fs_item]["__file__type__"]:
-                    # Add folders to magazine
-                    mag.append(current_folder[fs_item])
-                    path_mag.append(os.path.join(current_fs_path,fs_item))
-
-
+                child = node.children.get(fs_item)
+                if child is None:
+                    self.quarantine.put(os.path.join(current_fs_path,fs_item),path + [fs_item])
+                elif child.kind == "folder":
+                    pending.append((child,path + [fs_item]))
+        self.quarantine.evict()
+
+    def reconcileWorkspace(self,removed):
+        # Moves local copies of the removed folders and binaries to the quarantine, only these paths are visited
+        if not removed:
+            return
+        def work():
+            for path in removed:
+                self.quarantine.put(os.path.join(str(collare_home),*path),list(path))
+            self.quarantine.evict()
+        self.runTask("Cleaning up local files ... ",work)
+
+    def removedLocalPaths(self,old_paths,index):
+        # Top-most of 'old_paths' that are no longer in the manifest, their parents still exist
+        return [path for path in old_paths if path not in index.nodes and len(path) > 1 and path[:-1] in index.nodes]
+
+    def packGhidraProject(self,gpr_path,ghdb_path):
+        # Removes the project owner and packs the Ghidra project into 'ghdb' file
+        with open(os.path.join(gpr_path.replace(".gpr",".rep"),"project.prp"),"r") as project_prp:
+            project_prp_data = project_prp.read()
+        with open(os.path.join(gpr_path.replace(".gpr",".rep"),"project.prp"),"w") as project_prp:
+            project_prp.write(re.sub(r'<STATE NAME=\"OWNER.*>',"", project_prp_data))
+        with ZipFile(ghdb_path, 'w') as zipObj:
+            zipObj.write(gpr_path,os.path.basename(gpr_path))
+            self.addFolderToZip(zipObj,gpr_path.replace(".gpr",".rep"),os.path.dirname(gpr_path))
 
     def processIn(self,tool,path):
         # Process the initial binary in selected tool
-        data = {
-            "project": self.currentProject,
-            "path": path[:-1],
-            "file_name": path[-1]
-        }
-        try:
-            response = requests.post(f'{self.server}/getfile', json=data, auth=(self.username, self.password), verify=self.cert, timeout=(3,40))
-        except:
-            self.showPopupBox("Connection Error","Connection to the server is not working!",QMessageBox.Critical)
-            return
-        if response.status_code != 200:
-            self.showPopupBox("Error Donwloading File","Something went horribly wrong!",QMessageBox.Critical)
-        response_data = response.json()
         destination = os.path.join(str(collare_home),*path) # Create folder for each file
         if not os.path.exists(destination):
             os.makedirs(destination)
         file_path = os.path.join(destination,path[-1])
-        with open(file_path,"wb") as dest_file:
-            dest_file.write(base64.b64decode(response_data['file']))
+        project, digest = self.currentProject, self.manifestIndex.get(path).digest
+        self.runTask("Downloading binary file ... ",lambda: self.fetchBinary(project,path,file_path,digest),lambda result: self.launchTool(tool,path,file_path))
+
+    def launchTool(self,tool,path,file_path):
+        # Opens the downloaded binary in selected tool
+        destination = os.path.dirname(file_path)
         if tool == "binja":
-            Popen([f"binaryninja",file_path.replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True)
+            Popen([self.tools.executable("binaryninja"),file_path.replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True)
         elif tool == "hopper":
-            Popen([f"Hopper" ,"-e",file_path.replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True)
+            Popen([self.tools.executable("Hopper"),"-e",file_path.replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True)
         elif tool == "cutter":
-            Popen([f"Cutter",file_path.replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True,cwd=destination.replace("\\","\\\\"))
+            Popen([self.tools.executable("Cutter"),file_path.replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True,cwd=destination.replace("\\","\\\\"))
         elif tool == "ida":
-            Popen([f"ida64",file_path.replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True)
+            Popen([self.tools.executable("ida64"),file_path.replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True)
         elif tool == "ida32":
-            Popen([f"ida",file_path.replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True)
+            Popen([self.tools.executable("ida"),file_path.replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True)
         elif tool == "asp":
-            self.start_task("Generating Android Studio Project")
-            process = Popen([f"jadx","-d",file_path.replace("\\","\\\\")[:-4],"-e",file_path.replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True)
-            output, err = process.communicate()
-            with ZipFile(os.path.join(file_path+".asp"), 'w') as zipObj:
-                self.addFolderToZip(zipObj,file_path[:-4],os.path.dirname(file_path))
-            self.end_task()
-            self.showPopupBox("Android Studio Project Created","Automatic project creation was successful!\nPush local databases.",QMessageBox.Information)
+            def generate():
+                process = Popen([self.tools.executable("jadx"),"-d",file_path.replace("\\","\\\\")[:-4],"-e",file_path.replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True)
+                output, err = process.communicate()
+                with ZipFile(os.path.join(file_path+".asp"), 'w') as zipObj:
+                    self.addFolderToZip(zipObj,file_path[:-4],os.path.dirname(file_path))
+            self.runTask("Generating Android Studio Project",generate,lambda result: self.showPopupBox("Android Studio Project Created","Automatic project creation was successful!\nPush local databases.",QMessageBox.Information))
         elif tool == "jeb":
-            if os.name == "nt":
-                jeb = "jeb.bat"
-            else:
-                jeb = "jeb"
+            jeb = self.tools.executable("jeb")
             Popen([jeb,file_path.replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True)
         elif tool == "ghidra":          
-            self.start_task("Generating Ghidra Project ... ")
-            
-            if os.name == "nt":
-                headless = "analyzeHeadless.bat"
-            else:
-                headless = "analyzeHeadless"
-            process = Popen([headless, os.path.dirname(file_path.replace("\\","\\\\")),os.path.basename(file_path.replace("\\","\\\\")),'-import',file_path.replace("\\","\\\\")],stdout=PIPE, stderr=PIPE)
-            output, err = process.communicate()
-            self.end_task()
-            if b"ERROR REPORT" not in output:
-                # Success
-                with open(os.path.join(file_path+".rep","project.prp"),"r") as project_prp:
-                    project_prp_data = project_prp.read()
-                with open(os.path.join(file_path+".rep","project.prp"),"w") as project_prp:
-                    project_prp.write(re.sub(r'<STATE NAME=\"OWNER.*>',"", project_prp_data))
-                with ZipFile(os.path.join(file_path+".ghdb"), 'w') as zipObj:
-                    zipObj.write(file_path+".gpr",os.path.basename(file_path+".gpr"))
-                    self.addFolderToZip(zipObj,file_path + ".rep",os.path.dirname(file_path))
-                self.showPopupBox("Ghidra Project Created","Automatic project creation was successful!\nPush local databases.",QMessageBox.Information)
-            else:
+            headless = self.tools.executable("analyzeHeadless")
+            def generate():
+                process = Popen([headless, os.path.dirname(file_path.replace("\\","\\\\")),os.path.basename(file_path.replace("\\","\\\\")),'-import',file_path.replace("\\","\\\\")],stdout=PIPE, stderr=PIPE)
+                output, err = process.communicate()
+                if b"ERROR REPORT" in output:
+                    return False
+                self.packGhidraProject(file_path+".gpr",file_path+".ghdb")
+                return True
+            def done(success):
+                if success:
+                    self.showPopupBox("Ghidra Project Created","Automatic project creation was successful!\nPush local databases.",QMessageBox.Information)
+                    return
                 gpr_path, ok = QInputDialog.getText(self, 'Import Ghidra Project', f"Automatic project creation failed!\nThe file has been downloaded to '{file_path}'.\nPlease create a Ghidra project with name that matches the name of the file ({path[-1]}) and enter full path to the '{path[-1]}.gpr' file:")
                 if ok:
                     if os.path.exists(gpr_path):
-                        # Change project owner:
-                        with open(os.path.join(gpr_path.replace(".gpr",".rep"),"project.prp"),"r") as project_prp:
-                            project_prp_data = project_prp.read()
-                        with open(os.path.join(gpr_path.replace(".gpr",".rep"),"project.prp"),"w") as project_prp:
-                            project_prp.write(re.sub(r'<STATE NAME=\"OWNER.*>',"", project_prp_data))
-                        with ZipFile(os.path.join(destination,path[-1]+".ghdb"), 'w') as zipObj:
-                            zipObj.write(gpr_path,os.path.basename(gpr_path))
-                            self.addFolderToZip(zipObj,gpr_path.replace(".gpr",".rep"),os.path.dirname(gpr_path))
+                        self.runTask("Packing Ghidra Project ... ",lambda: self.packGhidraProject(gpr_path,os.path.join(destination,path[-1]+".ghdb")))
                     else:
                         self.showPopupBox("Ghidra Project","Specified file does not exist!",QMessageBox.Critical)
+            self.runTask("Generating Ghidra Project ... ",generate,done)
 
 
     def isCheckedOut(self,path):
         # Verify if the file is currently checkedout
         checkout, current_user = False, False
-        if reduce(dict.get,path[:-1],self.currentProjectManifest)["__rev_dbs__"][path[-1]]["checked-out"] != None:
+        locked = self.manifestIndex.get(path).locked
+        if locked != None:
             checkout = True
-            if reduce(dict.get,path[:-1],self.currentProjectManifest)["__rev_dbs__"][path[-1]]["checked-out"] == self.username:
+            if locked == self.username:
                 current_user = True
         return checkout,current_user
 
+    def getVersionHash(self,path,version):
+        # sha256 of the DB version as provided by the server manifest, older servers do not provide it
+        return self.manifestIndex.get(path).versionHash(version)
+
+    def getDeltaBase(self,path,version):
+        # Cached version of the DB file closest to 'version' that the server can send a delta against
+        if "delta_transfer" not in self.client.capabilities:
+            return None, None
+        node = self.manifestIndex.get(path)
+        # Summarized entries know only the hash of the latest version
+        base_versions = range(len(node.hashes)) if not node.summarized() else [node.latest] if node.latest is not None else []
+        for base_version in sorted(base_versions,key=lambda cached_version: abs(cached_version - version)):
+            digest = node.versionHash(base_version)
+            if digest and os.path.isfile(self.blobCache.blobPath(digest)):
+                return {"version":base_version,"hash":digest}, self.blobCache.blobPath(digest)
+        return None, None
+
+    def getDeltaSignatures(self,project,path,version,digest):
+        # Block signatures of 'version' of the DB file, from the local cache or from the server, runs in background tasks
+        # so the version and its hash are read from the manifest by the caller
+        if "delta_transfer" not in self.client.capabilities:
+            return None, None
+        if digest and os.path.isfile(self.blobCache.blobPath(digest)):
+            return version, file_signatures(self.blobCache.blobPath(digest))
+        data = {
+            "project": project,
+            "path": path[:-1],
+            "file_name": f"{path[-2]}.{path[-1]}",
+            "version": version
+        }
+        try:
+            return version, self.client.fetchSignatures(data)
+        except:
+            return None, None
+
+    def fetchBinary(self,project,path,file_path,digest):
+        # Gets the original binary from the local cache or from the server, runs in background tasks
+        if digest and self.blobCache.get(digest,file_path):
+            return
+        data = {
+            "project": project,
+            "path": path[:-1],
+            "file_name": path[-1]
+        }
+        response, response_data = self.client.download("getfile",data,file_path)
+        if response.status_code != 200 or response_data is None:
+            raise TaskError("Error Donwloading File","Something went horribly wrong!")
+        if digest:
+            self.blobCache.put(file_path,digest)
+
     def rightClickMenuHandle(self,event):
         # Get item which was clicked
         clickedItem = self.projectTreeView.itemAt(event)
+        if not self.connected:
+            # Project shown from the snapshot, only local copies can be opened
+            if clickedItem and clickedItem.whatsThis(0) == "db":
+                self.menu = QtWidgets.QMenu(self.projectTreeView)
+                self.menu.addSection("File operations")
+                self.menu.addAction(QIcon(os.path.join(current_running_file_dir,"icons","open.png")),"Open File")
+                if self.menu.exec_(self.projectTreeView.mapToGlobal(event)):
+                    self.openLocalDBFile(self.getPathToRoot(clickedItem))
+            return
         self.menu = QtWidgets.QMenu(self.projectTreeView)
         item = self.projectTreeView.itemAt(event)
         if item:
@@ -446,6 +2034,8 @@ class Ui_Dialog(object):
                 self.menu.addSection("File operations")
                 push_all = self.menu.addAction(QIcon(os.path.join(current_running_file_dir,"icons","upload.png")),"Push Local DBs")
                 delete_file = self.menu.addAction(QIcon(os.path.join(current_running_file_dir,"icons","delete.png")),"Delete File")
+                # DB nodes exist only once the binary was expanded
+                self.projectTreeView.model().fetchMore(self.projectTreeView.model().indexFor(clickedItem))
                 for node in range(0,clickedItem.childCount()):
                     disabled_tool = clickedItem.child(node).text(0)
                     if "i64" in disabled_tool:
@@ -465,19 +2055,19 @@ class Ui_Dialog(object):
                     if "asp" in disabled_tool:
                         open_asp.setEnabled(False)
                 # Enable/Disable tools based on PATH
-                if not self.which("ida64"):
+                if not self.tools.isAvailable("ida64"):
                     open_ida.setEnabled(False)
-                if not self.which("binaryninja"):
+                if not self.tools.isAvailable("binaryninja"):
                     open_binja.setEnabled(False)
-                if not self.which("Hopper"):
+                if not self.tools.isAvailable("Hopper"):
                     open_hop.setEnabled(False)
-                if not self.which("Cutter"):
+                if not self.tools.isAvailable("Cutter"):
                     open_rizin.setEnabled(False)
-                if not self.which("ghidraRun"):
+                if not self.tools.isAvailable("ghidraRun"):
                     open_ghidra.setEnabled(False)
-                if not self.which("jeb"):
+                if not self.tools.isAvailable("jeb"):
                     open_jeb.setEnabled(False)
-                if not self.which("android-studio") or (".apk" not in clickedItem.text(0).lower() and ".jar" not in clickedItem.text(0).lower()):
+                if not self.tools.isAvailable("android-studio") or (".apk" not in clickedItem.text(0).lower() and ".jar" not in clickedItem.text(0).lower()):
                     open_asp.setEnabled(False)
             else:
                 # Right click on one of the DB files
@@ -490,8 +2080,8 @@ class Ui_Dialog(object):
                 
                 checked,current_user =  self.isCheckedOut(self.getPathToRoot(clickedItem))
                 # submenu for version specific checkout and open
-                manifestPath = self.getPathToRoot(clickedItem)[:-1] + ["__rev_dbs__"] + [self.getPathToRoot(clickedItem)[-1]]
-                versions = reduce(dict.get,manifestPath,self.currentProjectManifest)["versions"]
+                versions = self.manifestIndex.get(self.getPathToRoot(clickedItem)).versions
+                summarized = self.manifestIndex.get(self.getPathToRoot(clickedItem)).summarized()
                 self.menu.addSection("Previous File Versions")
                 openSubmenu = QtWidgets.QMenu(self.menu)
                 openSubmenu.setTitle("Open Previous Version")
@@ -506,6 +2096,11 @@ class Ui_Dialog(object):
                     openAction = openSubmenu.addAction(f"#{counter}: {version}")
                     openAction.setWhatsThis("open_version")
                     counter += 1
+                if summarized:
+                    # Manifest has only the latest version, older ones are listed once the history is loaded
+                    for submenu in [checkoutSubmenu,openSubmenu]:
+                        historyAction = submenu.addAction("Load Version History")
+                        historyAction.setWhatsThis("load_history")
                 
                 if checked:
                     checkout.setEnabled(False)
@@ -556,18 +2151,18 @@ class Ui_Dialog(object):
             elif performed_action.text() == "Push Local DBs":
                 self.pushLocal(self.getPathToRoot(clickedItem))
             elif performed_action.text() == "Check-out":
-                manifestPath = self.getPathToRoot(clickedItem)[:-1] + ["__rev_dbs__"] + [self.getPathToRoot(clickedItem)[-1]]
-                version = reduce(dict.get,manifestPath,self.currentProjectManifest)["latest"]
+                version = self.manifestIndex.get(self.getPathToRoot(clickedItem)).latest
                 self.checkoutDBFile(self.getPathToRoot(clickedItem),version)
             elif performed_action.text() == "Check-in":
                 self.checkinDBFile(self.getPathToRoot(clickedItem))
             elif performed_action.text() == "Undo Check-out":
                 self.undoCheckoutDBFile(self.getPathToRoot(clickedItem))
             elif performed_action.text() == "Open File":
-                manifestPath = self.getPathToRoot(clickedItem)[:-1] + ["__rev_dbs__"] + [self.getPathToRoot(clickedItem)[-1]]
-                version = reduce(dict.get,manifestPath,self.currentProjectManifest)["latest"]
+                version = self.manifestIndex.get(self.getPathToRoot(clickedItem)).latest
                 self.openDBFile(self.getPathToRoot(clickedItem),version)
             elif performed_action.text() == "Refresh":
+                # Tools installed in the meantime show up as well
+                self.runTask("Looking for tools ... ",self.tools.scan,lambda result: self.projectTreeView.model().updateToolAvailability())
                 self.refreshProject()
             elif performed_action.text() == "Rename":
                 self.renameFolder(self.getPathToRoot(clickedItem),clickedItem)
@@ -575,8 +2170,30 @@ class Ui_Dialog(object):
                 self.checkoutDBFile(self.getPathToRoot(clickedItem),self.parseVersionFromText(performed_action.text()))
             elif performed_action.whatsThis() == "open_version":
                 self.openDBFile(self.getPathToRoot(clickedItem),self.parseVersionFromText(performed_action.text()))
+            elif performed_action.whatsThis() == "load_history":
+                self.loadVersionHistory(self.getPathToRoot(clickedItem),lambda: self.rightClickMenuHandle(event))
 
 
+    def loadVersionHistory(self,path,then):
+        # Completes a summarized DB entry with its version history, kept until the server changes the entry
+        data = {
+            "project": self.currentProject,
+            "path": path[:-1],
+            "file_name": f"{path[-2]}.{path[-1]}"
+        }
+        def done(history):
+            node = self.manifestIndex.get(path)
+            if history is None:
+                self.showPopupBox("Error Loading Version History","Something went horribly wrong!",QMessageBox.Critical)
+                return
+            elif node is None or len(history["versions"]) != node.count:
+                # Entry changed in the meantime
+                return
+            node.value["versions"], node.value["hashes"] = history["versions"], history.get("hashes",[])
+            node.versions, node.hashes = node.value["versions"], node.value["hashes"]
+            then()
+        self.runTask("Loading version history ... ",lambda: self.client.fetchHistory(data),done)
+
     def parseVersionFromText(self,text):
         return int(text[1:text.find(":")])
 
@@ -592,16 +2209,15 @@ class Ui_Dialog(object):
                 "path": path,
                 "dirname": dirname
             }
-            try:
-                response = requests.post(f'{self.server}/rename', json=data, auth=(self.username, self.password), verify=self.cert, timeout=(3,40))
-            except:
-                self.showPopupBox("Connection Error","Connection to the server is not working!",QMessageBox.Critical)
-                return
-            if response.status_code != 200:
-                self.showPopupBox("Error Renaming Folder","Something went horribly wrong!",QMessageBox.Critical)
-            elif response.text == "FOLDER_ALREADY_EXISTS":
-                self.showPopupBox("Error Renaming Folder","Folder with this name already exists!",QMessageBox.Critical)
-            self.refreshProject()
+            def done(response):
+                if response.status_code != 200:
+                    self.showPopupBox("Error Renaming Folder","Something went horribly wrong!",QMessageBox.Critical)
+                elif response.text == "FOLDER_ALREADY_EXISTS":
+                    self.showPopupBox("Error Renaming Folder","Folder with this name already exists!",QMessageBox.Critical)
+                else:
+                    self.applyOptimisticChanges([{"path":path,"value":None},{"path":path[:-1] + [dirname],"value":self.manifestIndex.get(path).value}])
+                self.refreshProject(response)
+            self.runTask("Renaming folder ... ",lambda: self.client.post("rename", json=data),done)
         
         
     
@@ -611,27 +2227,30 @@ class Ui_Dialog(object):
         containing_folder = os.path.join(str(collare_home),*path) # Sperate folder for files
         filename = path[-1]
         filename_no_extension = os.path.splitext(filename)[0]
-        for db_file in os.listdir(containing_folder):
-            filename_extension = os.path.splitext(db_file)[1][1:]
-            if db_file.startswith(filename_no_extension) and filename_extension in supported_db_names:
-                with open(os.path.join(containing_folder,db_file), "rb") as data_file:
-                    encoded_file = base64.b64encode(data_file.read()).decode("utf-8") 
-                if filename_extension == "hop" or filename_extension == "bndb":
-                    # Hopper and binary ninja do strip the extension by default when saving projects so check if we need to put it back
-                    if os.path.splitext(db_file)[0] != filename:
-                        db_file = filename + f".{filename_extension}"
-                values = {'path': path,"project":self.currentProject,"file":encoded_file,"file_name":db_file}
-                try:
-                    self.start_task("Pushing local DB file ... ")
-                    response = requests.post(f'{self.server}/pushdbfile', json=values, auth=(self.username, self.password), verify=self.cert, timeout=(3,40))
-                    self.end_task()
-                except:
-                    self.showPopupBox("Connection Error","Connection to the server is not working!",QMessageBox.Critical)
-                    self.end_task()
-                    return
-                if response.status_code != 200:
-                    self.showPopupBox("Error Uploading File","Something went horribly wrong!",QMessageBox.Critical)
-        self.refreshProject()
+        project = self.currentProject
+        def work():
+            failed = False
+            for db_file in os.listdir(containing_folder):
+                filename_extension = os.path.splitext(db_file)[1][1:]
+                if db_file.startswith(filename_no_extension) and filename_extension in supported_db_names:
+                    db_file_path = os.path.join(containing_folder,db_file)
+                    if filename_extension == "hop" or filename_extension == "bndb":
+                        # Hopper and binary ninja do strip the extension by default when saving projects so check if we need to put it back
+                        if os.path.splitext(db_file)[0] != filename:
+                            db_file = filename + f".{filename_extension}"
+                    values = {'path': path,"project":project,"file_name":db_file}
+                    response = self.client.upload("pushdbfile",db_file_path,values)
+                    if response.status_code != 200:
+                        failed = True
+            return failed
+        def done(failed):
+            if failed:
+                self.showPopupBox("Error Uploading File","Something went horribly wrong!",QMessageBox.Critical)
+            self.refreshProject()
+        def error(exception):
+            self.showPopupBox("Connection Error","Connection to the server is not working!",QMessageBox.Critical)
+            self.refreshProject()
+        self.runTask("Pushing local DB file ... ",work,done,error)
 
 
     def existingProjectSelectHandler(self):
@@ -641,27 +2260,32 @@ class Ui_Dialog(object):
         except:
             self.showPopupBox("Error","No project selected!",QMessageBox.Critical)
             return
-        try:
-            response = requests.get(f'{self.server}/openproject', params={"project":selectedProject}, auth=(self.username, self.password), verify=self.cert, timeout=(3,40))
-        except:
-            self.showPopupBox("Connection Error","Connection to the server is not working!",QMessageBox.Critical)
-            return
-        if response.status_code != 200:
-            self.showPopupBox("Error Opening Project","Something went horribly wrong!",QMessageBox.Critical)
-        else:
-            if response.text == "PROJECT_DOES_NOT_EXIST":
-                self.showPopupBox("Error Creating Project",f"Project with name '{selectedProject}' does not exist!",QMessageBox.Critical)
-                return
-            self.currentProjectManifest = response.json()
-            self.currentProject = selectedProject
-            self.frame_6.setEnabled(True)
-            self.projectTab.setEnabled(True)
-            self.mainTabWidget.setCurrentIndex(1)
-            self.projectTreeView.setProjectData(self.server,self.currentProject,self.username,self.password,self.cert,self)
-            self.currentProjectLocalPath = Path(collare_home / self.currentProject)
-            self.currentProjectLocalPath.mkdir(exist_ok=True)
-            self.populateCurrentProjectUserListing()
-            self.refreshProject()
+        def done(result):
+            response, manifest = result
+            if response.status_code != 200:
+                self.showPopupBox("Error Opening Project","Something went horribly wrong!",QMessageBox.Critical)
+            else:
+                if manifest is None:
+                    self.showPopupBox("Error Creating Project",f"Project with name '{selectedProject}' does not exist!",QMessageBox.Critical)
+                    return
+                self.currentProjectManifest, self.manifestIndex = manifest
+                self.optimisticChanges = []
+                self.currentProjectRevision = manifest_revision(response)
+                self.currentProject = selectedProject
+                self.frame_6.setEnabled(True)
+                self.projectTab.setEnabled(True)
+                self.mainTabWidget.setCurrentIndex(1)
+                self.projectTreeView.setProjectData(self.client,self.currentProject,self)
+                self.currentProjectLocalPath = Path(collare_home / self.currentProject)
+                self.currentProjectLocalPath.mkdir(exist_ok=True)
+                project, index = self.currentProject, self.manifestIndex
+                self.runTask("Cleaning up local files ... ",lambda: self.sweepWorkspace(project,index))
+                self.startEvents()
+                self.storeLastProject(self.currentProject)
+                self.populateCurrentProjectUserListing()
+                # Manifest from the reply is current, a refresh would only get 304
+                self.refreshProjectTree()
+        self.runTask("Opening project ... ",lambda: self.client.fetchManifest(selectedProject),done)
         
 
     def deleteExistingProjectHandler(self):
@@ -674,17 +2298,14 @@ class Ui_Dialog(object):
         questionBox = QMessageBox()
         answer = questionBox.question(self,"Deleting project", f"Are you sure that you want to delete '{selectedProject}' project?", questionBox.Yes | questionBox.No)
         if answer == questionBox.Yes:
-            try:
-                response = requests.get(f'{self.server}/deleteproject', params={"project":selectedProject}, auth=(self.username, self.password), verify=self.cert, timeout=(3,40))
-            except:
-                self.showPopupBox("Connection Error","Connection to the server is not working!",QMessageBox.Critical)
-                return
-            if response.status_code != 200:
-                self.showPopupBox("Error Deleting Project","Something went horribly wrong!",QMessageBox.Critical)
-            else:
-                self.showPopupBox("Success",f"Project '{selectedProject}' was deleted!",QMessageBox.Information)
-                shutil.rmtree(os.path.join(str(collare_home),selectedProject))
-                self.populateExistingProjects()
+            def done(response):
+                if response.status_code != 200:
+                    self.showPopupBox("Error Deleting Project","Something went horribly wrong!",QMessageBox.Critical)
+                else:
+                    self.showPopupBox("Success",f"Project '{selectedProject}' was deleted!",QMessageBox.Information)
+                    shutil.rmtree(os.path.join(str(collare_home),selectedProject))
+                    self.populateExistingProjects()
+            self.runTask("Deleting project ... ",lambda: self.client.get("deleteproject", params={"project":selectedProject}),done)
 
     def createNewProjectClickHandler(self):
         # Create new project
@@ -700,29 +2321,34 @@ class Ui_Dialog(object):
         if self.username not in user_list:
             user_list.append(self.username)
         data={"project":projectName,"users":user_list}
-        try:
-            response = requests.post(f'{self.server}/createproject', json=data, auth=(self.username, self.password), verify=self.cert, timeout=(3,40))
-        except:
-            self.showPopupBox("Connection Error","Connection to the server is not working!",QMessageBox.Critical)
-            return
-        if response.status_code != 200:
-            self.showPopupBox("Error Creating Project","Something went horribly wrong!",QMessageBox.Critical)
-        else:
-            if response.text == "ALREADY_EXISTS":
-                self.showPopupBox("Error Creating Project",f"Project with name '{projectName}' already exists!",QMessageBox.Critical)
-                return
-            self.showPopupBox("Success",f"New project '{projectName}' was created!",QMessageBox.Information)
-            self.populateExistingProjects()
-            self.currentProject = projectName
-            self.frame_6.setEnabled(True)
-            self.currentProjectManifest = response.json()
-            self.projectTab.setEnabled(True)
-            self.mainTabWidget.setCurrentIndex(1)
-            self.projectTreeView.setProjectData(self.server,self.currentProject,self.username,self.password,self.cert,self)
-            self.currentProjectLocalPath = Path(collare_home / self.currentProject)
-            self.currentProjectLocalPath.mkdir(exist_ok=True)
-            self.populateCurrentProjectUserListing()
-            self.refreshProject()
+        def done(response):
+            if response.status_code != 200:
+                self.showPopupBox("Error Creating Project","Something went horribly wrong!",QMessageBox.Critical)
+            else:
+                if response.text == "ALREADY_EXISTS":
+                    self.showPopupBox("Error Creating Project",f"Project with name '{projectName}' already exists!",QMessageBox.Critical)
+                    return
+                self.showPopupBox("Success",f"New project '{projectName}' was created!",QMessageBox.Information)
+                self.populateExistingProjects()
+                self.currentProject = projectName
+                self.frame_6.setEnabled(True)
+                self.currentProjectManifest = response.json()
+                self.manifestIndex = ManifestIndex(self.currentProjectManifest)
+                self.optimisticChanges = []
+                self.currentProjectRevision = manifest_revision(response)
+                self.projectTab.setEnabled(True)
+                self.mainTabWidget.setCurrentIndex(1)
+                self.projectTreeView.setProjectData(self.client,self.currentProject,self)
+                self.currentProjectLocalPath = Path(collare_home / self.currentProject)
+                self.currentProjectLocalPath.mkdir(exist_ok=True)
+                project, index = self.currentProject, self.manifestIndex
+                self.runTask("Cleaning up local files ... ",lambda: self.sweepWorkspace(project,index))
+                self.startEvents()
+                self.storeLastProject(self.currentProject)
+                self.populateCurrentProjectUserListing()
+                # Manifest from the reply is current, a refresh would only get 304
+                self.refreshProjectTree()
+        self.runTask("Creating project ... ",lambda: self.client.post("createproject", json=data),done)
 
     def mkdir(self,path):
         # Create directory
@@ -736,16 +2362,15 @@ class Ui_Dialog(object):
                 "path": path,
                 "dirname": dirname
             }
-            try:
-                response = requests.post(f'{self.server}/mkdir', json=data, auth=(self.username, self.password), verify=self.cert, timeout=(3,40))
-            except:
-                self.showPopupBox("Connection Error","Connection to the server is not working!",QMessageBox.Critical)
-                return
-            if response.status_code != 200:
-                self.showPopupBox("Error Creating Folder","Something went horribly wrong!",QMessageBox.Critical)
-            elif response.text == "FOLDER_ALREADY_EXISTS":
-                self.showPopupBox("Error Creating Folder","Folder with this name already exists!",QMessageBox.Critical)
-            self.refreshProject()
+            def done(response):
+                if response.status_code != 200:
+                    self.showPopupBox("Error Creating Folder","Something went horribly wrong!",QMessageBox.Critical)
+                elif response.text == "FOLDER_ALREADY_EXISTS":
+                    self.showPopupBox("Error Creating Folder","Folder with this name already exists!",QMessageBox.Critical)
+                else:
+                    self.applyOptimisticChanges([{"path":path + [dirname],"value":{"__file__type__":False,"__locked__":False}}])
+                self.refreshProject(response)
+            self.runTask("Creating folder ... ",lambda: self.client.post("mkdir", json=data),done)
     
     def deleteDir(self,path):
         # Delete directory
@@ -760,21 +2385,20 @@ class Ui_Dialog(object):
                 "path": path[:-1],
                 "dirname": path[-1]
             }
-            try:
-                response = requests.post(f'{self.server}/deletedir', json=data, auth=(self.username, self.password), verify=self.cert, timeout=(3,40))
-            except:
-                self.showPopupBox("Connection Error","Connection to the server is not working!",QMessageBox.Critical)
-                return
-            if response.status_code != 200:
-                self.showPopupBox("Error Deleting Folder","Something went horribly wrong!",QMessageBox.Critical)
-            self.refreshProject()
-            if response.text == "DONE":
-                try:
-                    shutil.rmtree(os.path.join(str(collare_home),*path))
-                except FileNotFoundError:
-                    pass
-            elif response.text == "CHECKEDOUT_FILE":
-                self.showPopupBox("Error Deleting Folder","One of the files in this folder is currently checked-out!",QMessageBox.Critical)
+            def done(response):
+                if response.status_code != 200:
+                    self.showPopupBox("Error Deleting Folder","Something went horribly wrong!",QMessageBox.Critical)
+                if response.text == "DONE":
+                    self.applyOptimisticChanges([{"path":path,"value":None}])
+                self.refreshProject(response)
+                if response.text == "DONE":
+                    try:
+                        shutil.rmtree(os.path.join(str(collare_home),*path))
+                    except FileNotFoundError:
+                        pass
+                elif response.text == "CHECKEDOUT_FILE":
+                    self.showPopupBox("Error Deleting Folder","One of the files in this folder is currently checked-out!",QMessageBox.Critical)
+            self.runTask("Deleting folder ... ",lambda: self.client.post("deletedir", json=data),done)
 
     def undoCheckoutDBFile(self,path):
         # Removes checkout flag from the file
@@ -784,18 +2408,16 @@ class Ui_Dialog(object):
             "path": path[:-1],
             "file_name": filename
         }
-        try:
-            response = requests.post(f'{self.server}/undocheckout', json=data, auth=(self.username, self.password), verify=self.cert, timeout=(3,40))
-        except:
-            self.showPopupBox("Connection Error","Connection to the server is not working!",QMessageBox.Critical)
-            return
-        if response.status_code != 200:
-            self.showPopupBox("Error During Undo Check-Out","Something went horribly wrong!",QMessageBox.Critical)
-            return
-        elif response.text == "FILE_NOT_CHECKEDOUT":
-            self.showPopupBox("Error During Undo Check-Out","File not checked out!",QMessageBox.Critical)
-            return
-        self.refreshProject()
+        def done(response):
+            if response.status_code != 200:
+                self.showPopupBox("Error During Undo Check-Out","Something went horribly wrong!",QMessageBox.Critical)
+                return
+            elif response.text == "FILE_NOT_CHECKEDOUT":
+                self.showPopupBox("Error During Undo Check-Out","File not checked out!",QMessageBox.Critical)
+                return
+            self.applyOptimisticChanges([self.changedBinary(path,**{"checked-out":None})])
+            self.refreshProject(response)
+        self.runTask("Undoing check-out ... ",lambda: self.client.post("undocheckout", json=data),done)
 
 
     def openDoubleClickWrapper(self):
@@ -803,108 +2425,101 @@ class Ui_Dialog(object):
         selected_item = self.projectTreeView.selectedItems()
         if selected_item:
             if selected_item[0].parent().whatsThis(0) == "binary":
-                manifestPath = self.getPathToRoot(selected_item[0])[:-1] + ["__rev_dbs__"] + [self.getPathToRoot(selected_item[0])[-1]]
-                version = reduce(dict.get,manifestPath,self.currentProjectManifest)["latest"]
+                version = self.manifestIndex.get(self.getPathToRoot(selected_item[0])).latest
                 self.openDBFile(self.getPathToRoot(selected_item[0]),version)
 
     def openDBFile(self,path,version):
         # Opens db file based on the relevant tool
         filename = f"{path[-2]}.{path[-1]}"
+        if not self.connected:
+            self.openLocalDBFile(path)
+            return
         data = {
             "project": self.currentProject,
             "path": path[:-1],
             "file_name": filename,
             "version": version
         }
-        try:
-            self.start_task("Opening DB file ... ")
-            response = requests.post(f'{self.server}/opendbfile', json=data, auth=(self.username, self.password), verify=self.cert, timeout=(3,40))
-            self.end_task()
-        except:
-            self.showPopupBox("Connection Error","Connection to the server is not working!",QMessageBox.Critical)
-            self.end_task()
-            return
-        if response.status_code != 200:
-            self.showPopupBox("Error Opening File","Something went horribly wrong!",QMessageBox.Critical)
-            return
-        elif response.text != "FILE_ALREADY_CHECKEDOUT":
-            self.showPopupBox("Opening File without Check-Out","Please consider the file to be open in 'read-only' mode. Re-opening the file or performing checkout will overwrite any changes made. Make sure to do 'Check-out' if you want to do some changes!",QMessageBox.Information)
-            response_data = response.json()
-            destination = os.path.join(str(collare_home),*path[:-1]) # Create folder for each file
-            if not os.path.exists(destination):
-                os.makedirs(destination)
-            file_path = os.path.join(destination,filename)
-            with open(file_path,"wb") as dest_file:
-                dest_file.write(base64.b64decode(response_data['file']))
-            with open(os.path.join(destination,"changes.json"),"wb") as changes_file:
-                changes_file.write(base64.b64decode(response_data['changes']))
-            if path[-1] == "ghdb":
-                destination = os.path.join(str(collare_home),*path[:-1])
-                file_path = os.path.join(destination,filename)
-                try:
-                    shutil.rmtree(file_path[:-4] + "rep")
-                except:
-                    pass
-                shutil.unpack_archive(file_path, destination, "zip")  
-            if path[-1] == "asp":
-                destination = os.path.join(str(collare_home),*path[:-1])
-                file_path = os.path.join(destination,filename)
-                try:
-                    shutil.rmtree(file_path[:-8])
-                except:
-                    pass
-                shutil.unpack_archive(file_path, destination, "zip") 
-        destination = os.path.join(str(collare_home),*path[:-1])
+        destination = os.path.join(str(collare_home),*path[:-1]) # Create folder for each file
+        if not os.path.exists(destination):
+            os.makedirs(destination)
         file_path = os.path.join(destination,filename)
+        digest = self.getVersionHash(path,version)
+        checked, current_user = self.isCheckedOut(path)
+        delta_base, delta_base_path = self.getDeltaBase(path,version)
+        if delta_base:
+            data["delta_base"] = delta_base
+        bin_digest = self.manifestIndex.get(path[:-1]).digest if path[-1] == "rzdb" else None
+        def work():
+            changes = None
+            if digest and not current_user and self.blobCache.getChanges(digest) is not None and self.blobCache.get(digest,file_path):
+                # Exact version is already available locally
+                changes = self.blobCache.getChanges(digest)
+            else:
+                response, response_data = self.client.download("opendbfile",data,file_path,delta_base_path)
+                if response.status_code != 200:
+                    raise TaskError("Error Opening File","Something went horribly wrong!")
+                elif response_data is not None:
+                    # Server replies with "FILE_ALREADY_CHECKEDOUT" instead of the file when it is checked-out to us
+                    changes = base64.b64decode(response_data['changes'])
+                    if digest:
+                        self.blobCache.put(file_path,digest,changes)
+            if changes is not None:
+                write_changes(destination,changes)
+                if path[-1] == "ghdb":
+                    try:
+                        shutil.rmtree(file_path[:-4] + "rep")
+                    except:
+                        pass
+                    shutil.unpack_archive(file_path, destination, "zip")  
+                if path[-1] == "asp":
+                    try:
+                        shutil.rmtree(file_path[:-8])
+                    except:
+                        pass
+                    shutil.unpack_archive(file_path, destination, "zip") 
+            if path[-1] == "rzdb":
+                # download binary as well
+                self.fetchBinary(data["project"],path[:-1],os.path.join(destination,path[-2]),bin_digest)
+            return changes
+        def done(changes):
+            if changes is not None:
+                self.showPopupBox("Opening File without Check-Out","Please consider the file to be open in 'read-only' mode. Re-opening the file or performing checkout will overwrite any changes made. Make sure to do 'Check-out' if you want to do some changes!",QMessageBox.Information)
+            self.openInTool(path,file_path)
+        self.runTask("Opening DB file ... ",work,done)
+
+    def openLocalDBFile(self,path):
+        # Without connection only the local copy of the DB file can be opened
+        file_path = os.path.join(str(collare_home),*path[:-1],f"{path[-2]}.{path[-1]}")
+        if not os.path.exists(file_path):
+            self.showPopupBox("Not Connected","There is no local copy of this file. Connect to the server to open it!",QMessageBox.Critical)
+            return
+        self.showPopupBox("Opening File without Connection","Please consider the file to be open in 'read-only' mode. Local copy of the file may not be the latest version!",QMessageBox.Information)
+        self.openInTool(path,file_path)
+
+    def openInTool(self,path,file_path):
+        # Starts the tool for the DB file, everything it needs is already unpacked next to 'file_path'
+        destination = os.path.dirname(file_path)
+        filename = os.path.basename(file_path)
         if path[-1] == "bndb":
             #Popen(f'binaryninja "{file_path}"'],stdin=None, stdout=None, stderr=None, close_fds=True)
-            Popen(['binaryninja',file_path.replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True)
+            Popen([self.tools.executable("binaryninja"),file_path.replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True)
         elif path[-1] == "hop":
-            Popen(['Hopper', '-d',file_path.replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True)
+            Popen([self.tools.executable("Hopper"), '-d',file_path.replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True)
         elif path[-1] == "rzdb":
-            # download binary as well
-            data = {
-            "project": self.currentProject,
-            "path": path[:-2],
-            "file_name": path[-2]
-            }
-            try:
-                self.start_task("Downloading binary file ... ")
-                bin_file_response = requests.post(f'{self.server}/getfile', json=data, auth=(self.username, self.password), verify=self.cert, timeout=(3,40))
-                self.end_task()
-            except:
-                self.showPopupBox("Connection Error","Connection to the server is not working!",QMessageBox.Critical)
-                self.end_task()
-                return
-            if bin_file_response.status_code != 200:
-                self.showPopupBox("Error Donwloading File","Something went horribly wrong!",QMessageBox.Critical)
-            bin_file_response_data = bin_file_response.json()
-            bin_destination = os.path.join(str(collare_home),*path[:-1])
-            bin_file_path = os.path.join(bin_destination,path[-2])
-            with open(bin_file_path,"wb") as dest_file:
-                dest_file.write(base64.b64decode(bin_file_response_data['file']))
-            Popen([f'Cutter',"-p", file_path.replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True,cwd=destination.replace("\\","\\\\"))
+            Popen([self.tools.executable("Cutter"),"-p", file_path.replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True,cwd=destination.replace("\\","\\\\"))
         elif path[-1] == "asp":
-            Popen(['android-studio',os.path.join(destination,filename.replace(".apk.asp","").replace(".jar.asp","")).replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True)
+            Popen([self.tools.executable("android-studio"),os.path.join(destination,filename.replace(".apk.asp","").replace(".jar.asp","")).replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True)
         elif path[-1] == "i64":
-            Popen([f'ida64',file_path.replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True)
+            Popen([self.tools.executable("ida64"),file_path.replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True)
         elif path[-1] == "idb":
-            Popen([f'ida',file_path.replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True)
+            Popen([self.tools.executable("ida"),file_path.replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True)
         elif path[-1] == "jdb2":
-
-            # has to be jeb.bat for windows
-            if os.name == "nt":
-                jeb = "jeb.bat"
-            else:
-                jeb = "jeb"
+            jeb = self.tools.executable("jeb")
             Popen([jeb,file_path.replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True)
         elif path[-1] == "ghdb":
-            if os.name == "nt":
-                ghidraRun = "ghidraRun.bat"
-            else:
-                ghidraRun = "ghidraRun"
+            ghidraRun = self.tools.executable("ghidraRun")
             Popen([ghidraRun,os.path.join(destination,filename.replace("ghdb","gpr")).replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True)
-        self.refreshProject()
     
     def checkoutDBFile(self,path,version):
         # Checks-out the DB file for editing
@@ -915,86 +2530,65 @@ class Ui_Dialog(object):
             "file_name": filename,
             "version": version
         }
-        try:
-            self.start_task("Checking out DB file ... ")
-            response = requests.post(f'{self.server}/checkout', json=data, auth=(self.username, self.password), verify=self.cert, timeout=(3,40))
-            self.end_task()
-        except:
-            self.showPopupBox("Connection Error","Connection to the server is not working!",QMessageBox.Critical)
-            self.end_task()
-            return
-        if response.status_code != 200:
-            self.showPopupBox("Error During Check-Out","Something went horribly wrong!",QMessageBox.Critical)
-            return
-        elif response.text == "FILE_ALREADY_CHECKEDOUT":
-            self.showPopupBox("Error During Check-Out","File already checked out!",QMessageBox.Critical)
-            self.refreshProject()
-            return
-        response_data = response.json()
         destination = os.path.join(str(collare_home),*path[:-1]) # Create folder for each file
         if not os.path.exists(destination):
             os.makedirs(destination)
         file_path = os.path.join(destination,filename)
-        with open(file_path,"wb") as dest_file:
-            dest_file.write(base64.b64decode(response_data['file']))
-        with open(os.path.join(destination,"changes.json"),"wb") as changes_file:
-            changes_file.write(base64.b64decode(response_data['changes']))
-        if path[-1] == "bndb":
-            Popen(["binaryninja", file_path.replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True)
-        elif path[-1] == "hop":
-            Popen(["Hopper", "-d",file_path.replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True)
-        elif path[-1] == "rzdb":
-            # download binary as well
-            data = {
-            "project": self.currentProject,
-            "path": path[:-2],
-            "file_name": path[-2]
-            }
-            try:
-                self.start_task("Downloading binary file ... ")
-                bin_file_response = requests.post(f'{self.server}/getfile', json=data, auth=(self.username, self.password), verify=self.cert, timeout=(3,40))
-                self.end_task()
-            except:
-                self.showPopupBox("Connection Error","Connection to the server is not working!",QMessageBox.Critical)
-                self.end_task()
+        digest = self.getVersionHash(path,version)
+        delta_base, delta_base_path = None, None
+        if digest and "cached_checkout" in self.client.capabilities and os.path.isfile(self.blobCache.blobPath(digest)):
+            # Server only locks the file and sends the changes when we already have this exact version
+            data["cached_hash"] = digest
+        else:
+            # Patch against another cached version if there is one
+            delta_base, delta_base_path = self.getDeltaBase(path,version)
+            if delta_base:
+                data["delta_base"] = delta_base
+        bin_digest = self.manifestIndex.get(path[:-1]).digest if path[-1] == "rzdb" else None
+        def work():
+            response, response_data = self.client.download("checkout",data,file_path,delta_base_path)
+            if response.status_code != 200:
+                raise TaskError("Error During Check-Out","Something went horribly wrong!")
+            elif response_data is None:
+                # Reply carries only a status text
+                return response.text
+            changes = base64.b64decode(response_data['changes'])
+            if response_data.get("cached") and not self.blobCache.get(digest,file_path):
+                return "CACHE_MISS"
+            elif digest and not response_data.get("cached"):
+                self.blobCache.put(file_path,digest,changes)
+            write_changes(destination,changes)
+            if path[-1] == "rzdb":
+                # download binary as well
+                self.fetchBinary(data["project"],path[:-1],os.path.join(destination,path[-2]),bin_digest)
+            elif path[-1] == "asp":
+                try:
+                    shutil.rmtree(file_path[:-8])
+                except:
+                    pass
+                shutil.unpack_archive(file_path, destination, "zip") 
+            elif path[-1] == "ghdb":
+                try:
+                    shutil.rmtree(file_path[:-4] + "rep")
+                except:
+                    pass
+                shutil.unpack_archive(file_path, destination, "zip")  
+            return None
+        def done(status):
+            if status == "FILE_ALREADY_CHECKEDOUT":
+                self.showPopupBox("Error During Check-Out","File already checked out!",QMessageBox.Critical)
+            elif status == "CACHE_MISS":
+                self.showPopupBox("Error During Check-Out","Cached DB file disappeared, please check-out the file again!",QMessageBox.Critical)
+                self.undoCheckoutDBFile(path)
+                return
+            elif status is not None:
+                self.showPopupBox("Error During Check-Out","Something went horribly wrong!",QMessageBox.Critical)
                 return
-            if bin_file_response.status_code != 200:
-                self.showPopupBox("Error Donwloading File","Something went horribly wrong!",QMessageBox.Critical)
-            bin_file_response_data = bin_file_response.json()
-            bin_destination = os.path.join(str(collare_home),*path[:-1])
-            bin_file_path = os.path.join(bin_destination,path[-2])
-            with open(bin_file_path,"wb") as dest_file:
-                dest_file.write(base64.b64decode(bin_file_response_data['file']))
-            Popen(["Cutter","-p",file_path.replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True,cwd=destination.replace("\\","\\\\"))
-        elif path[-1] == "asp":
-            try:
-                shutil.rmtree(file_path[:-8])
-            except:
-                pass
-            shutil.unpack_archive(file_path, destination, "zip") 
-            Popen(['android-studio',os.path.join(destination,filename.replace(".apk.asp","").replace(".jar.asp","")).replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True)
-        elif path[-1] == "i64":
-            Popen(["ida64",file_path.replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True)
-        elif path[-1] == "idb":
-            Popen(["ida",file_path.replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True)
-        elif path[-1] == "jdb2":
-            if os.name == "nt":
-                jeb = "jeb.bat"
-            else:
-                jeb = "jeb"
-            Popen([jeb,file_path.replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True)
-        elif path[-1] == "ghdb":
-            if os.name == "nt":
-                ghidraRun = "ghidraRun.bat"
             else:
-                ghidraRun = "ghidraRun"
-            try:
-                shutil.rmtree(file_path[:-4] + "rep")
-            except:
-                pass
-            shutil.unpack_archive(file_path, destination, "zip")  
-            Popen([ghidraRun,os.path.join(destination,filename.replace('ghdb','gpr')).replace("\\","\\\\")],stdin=None, stdout=None, stderr=None, close_fds=True)
-        self.refreshProject()
+                self.applyOptimisticChanges([self.changedBinary(path,**{"checked-out":self.username})])
+                self.openInTool(path,file_path)
+            self.refreshProject()
+        self.runTask("Checking out DB file ... ",work,done)
 
     def checkinDBFile(self,path):
         # Performs check-in of the checked-out file, this is the only way to update DB files on the server
@@ -1009,33 +2603,62 @@ class Ui_Dialog(object):
                 comment = "NoComment"
             containing_folder = os.path.join(str(collare_home),*path[:-1]) # Seperate folder for files
             filename = f"{path[-2]}.{path[-1]}"
-            if path[-1] == "ghdb":
-                gpr_path = os.path.join(containing_folder,path[-2] + ".gpr")
-                with ZipFile(os.path.join(containing_folder,filename), 'w') as zipObj:
-                    zipObj.write(gpr_path,os.path.basename(gpr_path))
-                    self.addFolderToZip(zipObj,gpr_path.replace("gpr","rep"),os.path.dirname(gpr_path))
-            if path[-1] == "asp":
-                project_folder = os.path.join(containing_folder,path[-2][:-4])
-                with ZipFile(os.path.join(containing_folder,filename), 'w') as zipObj:
-                    self.addFolderToZip(zipObj,project_folder,os.path.dirname(project_folder))
-            with open(os.path.join(containing_folder,"changes.json"), "rb") as changes_file:
-                changes_content = base64.b64encode(changes_file.read()).decode("utf-8")
-            with open(os.path.join(containing_folder,filename), "rb") as data_file:
-                encoded_file = base64.b64encode(data_file.read()).decode("utf-8") 
-            values = {'path': path[:-1],"project":self.currentProject,"file":encoded_file,"file_name":filename,"checkout":checkout,"comment":comment,"changes":changes_content}
-            try:
-                self.start_task("Checking in the DB file ... ")
-                response = requests.post(f'{self.server}/checkin', json=values, auth=(self.username, self.password), verify=self.cert, timeout=(3,40))
-                self.end_task()
-            except:
-                self.showPopupBox("Connection Error","Connection to the server is not working!",QMessageBox.Critical)
-                self.end_task()
-                return
-            if response.status_code != 200:
-                self.showPopupBox("Error During Check-In","Something went horribly wrong!",QMessageBox.Critical)
-            elif response.text == "FILE_NOT_CHECKEDOUT":
-                self.showPopupBox("Error During Check-In","File is not checked-out to you!",QMessageBox.Critical)
-            self.refreshProject()
+            # Manifest changes on the GUI thread while the check-in runs
+            project = self.currentProject
+            base_version = self.manifestIndex.get(path).latest
+            base_digest = self.getVersionHash(path,base_version)
+            def work():
+                if path[-1] == "ghdb":
+                    gpr_path = os.path.join(containing_folder,path[-2] + ".gpr")
+                    with ZipFile(os.path.join(containing_folder,filename), 'w') as zipObj:
+                        zipObj.write(gpr_path,os.path.basename(gpr_path))
+                        self.addFolderToZip(zipObj,gpr_path.replace("gpr","rep"),os.path.dirname(gpr_path))
+                if path[-1] == "asp":
+                    project_folder = os.path.join(containing_folder,path[-2][:-4])
+                    with ZipFile(os.path.join(containing_folder,filename), 'w') as zipObj:
+                        self.addFolderToZip(zipObj,project_folder,os.path.dirname(project_folder))
+                with open(os.path.join(containing_folder,"changes.json"), "rb") as changes_file:
+                    changes = changes_file.read()
+                changes_content = base64.b64encode(changes).decode("utf-8")
+                values = {'path': path[:-1],"project":project,"file_name":filename,"checkout":checkout,"comment":comment,"changes":changes_content}
+                changes_delta = read_changes_delta(containing_folder,path[-1],changes) if "changes_delta" in self.client.capabilities else None
+                if changes_delta:
+                    # Server applies the delta to the changes of the checked-out version
+                    values = dict(values,changes_delta=changes_delta)
+                    del values["changes"]
+                delta_version, signatures = self.getDeltaSignatures(project,path,base_version,base_digest)
+                while True:
+                    response = None
+                    if signatures:
+                        delta_values = dict(values,delta={"base_version":delta_version,"block_size":delta_block_size})
+                        response = self.client.uploadDelta("checkin",os.path.join(containing_folder,filename),delta_values,signatures)
+                        if response.status_code == 200 and response.text == "DELTA_BASE_UNKNOWN":
+                            # Server no longer has the base version, fall back to full upload
+                            response, signatures = None, None
+                    if response is None:
+                        response = self.client.upload("checkin",os.path.join(containing_folder,filename),values)
+                    if "changes_delta" in values and response.status_code == 200 and response.text == "CHANGES_BASE_UNKNOWN":
+                        # Same upload again with the whole changes.json
+                        values = dict(values,changes=changes_content)
+                        del values["changes_delta"]
+                        continue
+                    break
+                if response.status_code == 200 and response.text != "FILE_NOT_CHECKEDOUT":
+                    # New version is now the same as the local file
+                    self.blobCache.put(os.path.join(containing_folder,filename),changes=changes)
+                    if os.path.exists(os.path.join(containing_folder,"changes.delta.json")):
+                        # Checked-in changes are the base of the next delta
+                        os.remove(os.path.join(containing_folder,"changes.delta.json"))
+                return response
+            def done(response):
+                if response.status_code != 200:
+                    self.showPopupBox("Error During Check-In","Something went horribly wrong!",QMessageBox.Critical)
+                elif response.text == "FILE_NOT_CHECKEDOUT":
+                    self.showPopupBox("Error During Check-In","File is not checked-out to you!",QMessageBox.Critical)
+                elif not checkout:
+                    self.applyOptimisticChanges([self.changedBinary(path,**{"checked-out":None})])
+                self.refreshProject(response)
+            self.runTask("Checking in the DB file ... ",work,done)
 
     def deleteFile(self,path):
         # Removes any file from the server (and local) storage
@@ -1047,53 +2670,199 @@ class Ui_Dialog(object):
                 "path": path[:-1],
                 "filename": path[-1]
             }
-            try:
-                response = requests.post(f'{self.server}/deletefile', json=data, auth=(self.username, self.password), verify=self.cert, timeout=(3,40))
-            except:
-                self.showPopupBox("Connection Error","Connection to the server is not working!",QMessageBox.Critical)
-                return
-            if response.status_code != 200:
-                self.showPopupBox("Error Deleting File","Something went horribly wrong!",QMessageBox.Critical)
-            self.refreshProject()
-            if response.text == "DONE":
-                if path[-1] in supported_db_names:
-                    remove_path = os.path.join(str(collare_home),*path[:-1],path[-2]) + f".{path[-1]}"
-                    if os.path.exists(remove_path):
-                        os.remove(remove_path)
-                elif os.path.exists(os.path.join(str(collare_home),*path)):
-                    shutil.rmtree(os.path.join(str(collare_home),*path))
-            elif response.text == "CHECKEDOUT_FILE":
-                self.showPopupBox("Error Deleting Folder","This file is currently checked-out!",QMessageBox.Critical)
+            def done(response):
+                if response.status_code != 200:
+                    self.showPopupBox("Error Deleting File","Something went horribly wrong!",QMessageBox.Critical)
+                if response.text == "DONE":
+                    if path[-1] in supported_db_names:
+                        binary = json.loads(json.dumps(self.manifestIndex.get(path[:-1]).value))
+                        binary["__rev_dbs__"].pop(path[-1],None)
+                        self.applyOptimisticChanges([{"path":path[:-1],"value":binary}])
+                    else:
+                        self.applyOptimisticChanges([{"path":path,"value":None}])
+                self.refreshProject(response)
+                if response.text == "DONE":
+                    if path[-1] in supported_db_names:
+                        remove_path = os.path.join(str(collare_home),*path[:-1],path[-2]) + f".{path[-1]}"
+                        if os.path.exists(remove_path):
+                            os.remove(remove_path)
+                    elif os.path.exists(os.path.join(str(collare_home),*path)):
+                        shutil.rmtree(os.path.join(str(collare_home),*path))
+                elif response.text == "CHECKEDOUT_FILE":
+                    self.showPopupBox("Error Deleting Folder","This file is currently checked-out!",QMessageBox.Critical)
+            self.runTask("Deleting file ... ",lambda: self.client.post("deletefile", json=data),done)
                 
 
-    def refreshProject(self):
-        # Refershes the view of the project
-        response = requests.get(f'{self.server}/openproject', params={"project":self.currentProject}, auth=(self.username, self.password), verify=self.cert, timeout=(3,40))
-        if response.status_code != 200:
-            self.showPopupBox("Error Refershing Project Data","Something went horribly wrong!",QMessageBox.Critical)
+    def refreshProject(self,response=None):
+        # Schedules refresh of the project, all requests within 'refresh_delay_ms' end up in a single fetch
+        # Replies to changes made by this client carry the resulting revision (X-Collare-Revision), when it is already
+        # shown (usually thanks to the change events) no fetch is needed at all
+        revision = response.headers.get("X-Collare-Revision") if response is not None else None
+        self.refreshStats["requested"] += 1
+        if revision is None:
+            self.refreshForced = True
         else:
-            if response.text == "PROJECT_DOES_NOT_EXIST":
-                self.showPopupBox("Error Refershing Project Data",f"Project with name '{self.currentProject}' does not exist!",QMessageBox.Critical)
+            self.refreshRevision = revision
+        if self.refreshTimer.isActive() or self.refreshInFlight:
+            self.refreshStats["coalesced"] += 1
+            self.updateRefreshStats()
+            return
+        self.refreshTimer.start(self.settings["refresh_delay_ms"])
+
+    def runScheduledRefresh(self):
+        if self.refreshInFlight:
+            return
+        forced, revision = self.refreshForced, self.refreshRevision
+        self.refreshForced, self.refreshRevision = False, None
+        if not forced and not self.optimisticChanges and (revision is None or revision == self.currentProjectRevision):
+            self.refreshStats["skipped"] += 1
+            self.updateRefreshStats()
+            return
+        self.refreshStats["fetched"] += 1
+        self.updateRefreshStats()
+        self.refreshInFlight = True
+        self.fetchProject()
+
+    def onFetchProjectFinished(self):
+        self.refreshInFlight = False
+        if self.refreshForced or self.refreshRevision is not None:
+            # Requested while the fetch was running
+            self.refreshTimer.start(self.settings["refresh_delay_ms"])
+
+    def updateRefreshStats(self):
+        self.progress_label.setToolTip("Project refreshes - requested: {requested}, fetched: {fetched}, coalesced: {coalesced}, skipped: {skipped}".format(**self.refreshStats))
+
+    def fetchProject(self):
+        # Refershes the view of the project
+        # With a known revision the server replies 304 when nothing changed, 'manifest_delta' servers send only the changed entries
+        project = self.currentProject
+        revision = self.currentProjectRevision
+        optimistic = len(self.optimisticChanges)
+        client = self.client
+        def work():
+            if revision is not None and "manifest_delta" in client.capabilities:
+                response = client.get("manifestdelta", params=client.manifestParams({"project":project,"since":revision}))
+                if response.status_code == 200 and response.text not in ["REVISION_UNKNOWN","PROJECT_DOES_NOT_EXIST"]:
+                    return response, "delta", response.json()
+            headers = {"If-None-Match":f'"{revision}"'} if revision is not None else {}
+            # Index is built here as well so that the GUI thread only swaps it in
+            response, manifest = client.fetchManifest(project,headers)
+            if manifest is None:
+                return response, None, None
+            return response, "full", manifest
+        def done(result):
+            self.onFetchProjectFinished()
+            response, kind, manifest = result
+            if project != self.currentProject or revision != self.currentProjectRevision:
+                # Another project was opened or a newer refresh finished in the meantime
+                return
+            if response.status_code == 304 or (kind == "delta" and not manifest["changes"]):
+                if self.optimisticChanges and len(self.optimisticChanges) <= optimistic:
+                    # Server does not know about the changes shown optimistically, newer ones are verified by the next refresh
+                    self.refreshProjectTree(self.revertOptimisticChanges())
                 return
-            self.currentProjectManifest = response.json()
-        self.refreshProjectTree()
-        self.autoRemoveDirs()
-        self.projectTreeView.expandAll()
+            if response.status_code != 200:
+                self.showPopupBox("Error Refershing Project Data","Something went horribly wrong!",QMessageBox.Critical)
+            else:
+                if kind is None:
+                    self.showPopupBox("Error Refershing Project Data",f"Project with name '{self.currentProject}' does not exist!",QMessageBox.Critical)
+                    return
+                if kind == "delta":
+                    self.applyManifestChanges(manifest["changes"],manifest["revision"])
+                    return
+                self.revertOptimisticChanges()
+                old_paths = self.manifestIndex.localPaths([project])
+                self.currentProjectManifest, self.manifestIndex = manifest
+                self.currentProjectRevision = manifest_revision(response)
+                self.reconcileWorkspace(self.removedLocalPaths(old_paths,self.manifestIndex))
+            self.refreshProjectTree()
+        def error(exception):
+            self.onFetchProjectFinished()
+            self.showPopupBox("Connection Error","Connection to the server is not working!",QMessageBox.Critical)
+        self.runTask("Refreshing project ... ",work,done,error)
+
+    def applyManifestChanges(self,changes,revision):
+        # Applies manifest changes (from '/manifestdelta' or a change event) to the manifest, index, tree and local files
+        # The changes are relative to 'currentProjectRevision' so optimistic changes are reverted first, the server
+        # changes contain them if the operations really happened
+        reverted = self.revertOptimisticChanges()
+        old_paths = [path for change in changes for path in self.manifestIndex.localPaths(change["path"])]
+        apply_manifest_changes(self.currentProjectManifest,changes)
+        self.manifestIndex.update(changes)
+        self.currentProjectRevision = revision
+        self.reconcileWorkspace(self.removedLocalPaths(old_paths,self.manifestIndex))
+        self.refreshProjectTree(reverted + [change["path"] for change in changes])
+
+    def applyOptimisticChanges(self,changes):
+        # Shows the known effect of a successful operation right away, the scheduled refresh verifies it against the server
+        # Values replaced here are kept so that the refresh can go back to the state of the known revision first
+        inverse = []
+        for change in changes:
+            node = self.manifestIndex.get(change["path"])
+            inverse.append({"path":change["path"],"value":json.loads(json.dumps(node.value)) if node is not None else None})
+        self.optimisticChanges.append(inverse)
+        apply_manifest_changes(self.currentProjectManifest,changes)
+        self.manifestIndex.update(changes)
+        self.refreshProjectTree([change["path"] for change in changes])
+
+    def revertOptimisticChanges(self):
+        # Back to the state of 'currentProjectRevision', the tree is updated by whatever is applied next
+        # Returns the reverted paths
+        paths = []
+        for inverse in reversed(self.optimisticChanges):
+            for change in reversed(inverse):
+                apply_manifest_changes(self.currentProjectManifest,[change])
+                self.manifestIndex.update([change])
+                paths.append(change["path"])
+        self.optimisticChanges = []
+        return paths
+
+    def changedBinary(self,path,**fields):
+        # Change replacing the binary of the DB at 'path' with a copy where the DB entry has 'fields' updated
+        binary = json.loads(json.dumps(self.manifestIndex.get(path[:-1]).value))
+        binary["__rev_dbs__"][path[-1]].update(fields)
+        return {"path":path[:-1],"value":binary}
+
+    def startEvents(self):
+        # Live changes of the open project made by others, servers without 'events' are only refreshed after actions
+        self.stopEvents()
+        if "events" not in self.client.capabilities:
+            return
+        self.eventListener = EventListener(self.client,self.currentProject,self.currentProjectRevision,self.settings["events_timeout"])
+        self.eventListener.changes.connect(self.onManifestEvent)
+        self.eventListener.resync.connect(self.onResyncEvent)
+        self.eventListener.start()
+
+    def stopEvents(self):
+        if self.eventListener:
+            self.eventListener.stop()
+            self.eventListener = None
+
+    def onManifestEvent(self,project,event):
+        if project != self.currentProject or event.get("base") == event["revision"]:
+            return
+        if event.get("base") != self.currentProjectRevision:
+            # Missed something (or this is our own refresh racing the event), let the refresh sort it out
+            if event["revision"] != self.currentProjectRevision:
+                self.refreshProject()
+            return
+        self.applyManifestChanges(event["changes"],event["revision"])
+
+    def onResyncEvent(self,project):
+        if project == self.currentProject:
+            self.refreshProject()
 
     def changePasswordClickHandler(self):
         req_data = {"password":self.newPasswrdText1.text()}
         if self.newPasswrdText1.text() != self.newPasswrdText2.text():
             self.showPopupBox("Password Change Error","Passwords don't match!",QMessageBox.Critical)
             return
-        try:
-            response = requests.post(f'{self.server}/changepwd', data=req_data, auth=(self.username, self.password), verify=self.cert, timeout=(3,40))
-        except:
-            self.showPopupBox("Connection Error","Connection to the server is not working!",QMessageBox.Critical)
-            return
-        if response.status_code != 200:
-            self.showPopupBox("Error Changing Password","Something went horribly wrong!",QMessageBox.Critical)
-        else:
-            self.showPopupBox("Password Changed",f"Password for user '{self.username}' was changed! Please disconnect and connect again with the new password!",QMessageBox.Information)
+        def done(response):
+            if response.status_code != 200:
+                self.showPopupBox("Error Changing Password","Something went horribly wrong!",QMessageBox.Critical)
+            else:
+                self.showPopupBox("Password Changed",f"Password for user '{self.username}' was changed! Please disconnect and connect again with the new password!",QMessageBox.Information)
+        self.runTask("Changing password ... ",lambda: self.client.post("changepwd", data=req_data),done)
 
 
     def addNewGlobalUserClickHandler(self):
@@ -1104,67 +2873,55 @@ class Ui_Dialog(object):
         if not req_data["username"] or not req_data["password"]:
             self.showPopupBox("Cannot create user","Make sure to fill in all fields!",QMessageBox.Critical)
             return
-        try:
-            response = requests.post(f'{self.server}/adduser', data=req_data, auth=(self.username, self.password), verify=self.cert, timeout=(3,40))
-        except:
-            self.showPopupBox("Connection Error","Connection to the server is not working!",QMessageBox.Critical)
-            return
-        if response.status_code != 200:
-            self.showPopupBox("Error Creating User","Something went horribly wrong!",QMessageBox.Critical)
-        else:
-            self.showPopupBox("New User Added",f"New user with name {self.newUserNameText.text()} was added!",QMessageBox.Information)
-            self.populateAllUserListings()
+        def done(response):
+            if response.status_code != 200:
+                self.showPopupBox("Error Creating User","Something went horribly wrong!",QMessageBox.Critical)
+            else:
+                self.showPopupBox("New User Added",f"New user with name {self.newUserNameText.text()} was added!",QMessageBox.Information)
+                self.populateAllUserListings()
+        self.runTask("Adding user ... ",lambda: self.client.post("adduser", data=req_data),done)
 
     def populateAllUserListings(self):
-        try:
-            response = requests.get(f'{self.server}/getusers', auth=(self.username, self.password), verify=self.cert, timeout=(3,40))
-        except:
-            self.showPopupBox("Connection Error","Connection to the server is not working!",QMessageBox.Critical)
-            return
-        if response.status_code != 200:
-            self.showPopupBox("Error Getting Users","Something went horribly wrong!",QMessageBox.Critical)
-            return
-        user_list = response.json()
-        self.newProjectUsersList.clear()
-        self.newProjectUsersList.addItems(user_list["users"])
-        self.projectAllUsersView.clear()
-        self.projectAllUsersView.addItems(user_list["users"])
-        self.deleteGlobalUsersList.clear()
-        self.deleteGlobalUsersList.addItems(user_list["users"])
+        def done(response):
+            if response.status_code != 200:
+                self.showPopupBox("Error Getting Users","Something went horribly wrong!",QMessageBox.Critical)
+                return
+            user_list = response.json()
+            self.newProjectUsersList.clear()
+            self.newProjectUsersList.addItems(user_list["users"])
+            self.projectAllUsersView.clear()
+            self.projectAllUsersView.addItems(user_list["users"])
+            self.deleteGlobalUsersList.clear()
+            self.deleteGlobalUsersList.addItems(user_list["users"])
+        self.runTask("Loading users ... ",lambda: self.client.get("getusers"),done)
     
     def populateCurrentProjectUserListing(self):
-        try:
-            response = requests.get(f'{self.server}/getprojectusers', params={"project":self.currentProject}, auth=(self.username, self.password), verify=self.cert, timeout=(3,40))
-        except:
-            self.showPopupBox("Connection Error","Connection to the server is not working!",QMessageBox.Critical)
-            return
-        if response.status_code != 200:
-            self.showPopupBox("Error Getting Users","Something went horribly wrong!",QMessageBox.Critical)
-            return
-        user_list = response.json()
-        self.projectCurrentUsersView.clear()
-        self.projectCurrentUsersView.addItems(user_list["users"])
+        def done(response):
+            if response.status_code != 200:
+                self.showPopupBox("Error Getting Users","Something went horribly wrong!",QMessageBox.Critical)
+                return
+            user_list = response.json()
+            self.projectCurrentUsersView.clear()
+            self.projectCurrentUsersView.addItems(user_list["users"])
+        self.runTask("Loading project users ... ",lambda: self.client.get("getprojectusers", params={"project":self.currentProject}),done)
 
     def populateExistingProjects(self):
-        try:
-            response = requests.get(f'{self.server}/getprojectlist', auth=(self.username, self.password), verify=self.cert, timeout=(3,40))
-        except:
-            self.showPopupBox("Connection Error","Connection to the server is not working!",QMessageBox.Critical)
-            return
-        if response.status_code != 200:
-            self.showPopupBox("Error Getting Projects","Something went horribly wrong!",QMessageBox.Critical)
-            return
-        project_list = response.json()
-        self.existingProjectsList.clear()
-        self.existingProjectsList.addItems(project_list["projects"])
-        for item in os.listdir(str(collare_home)):
-            full_path = os.path.join(str(collare_home),item)
-            if os.path.isdir(full_path):
-                if item not in project_list["projects"]:
-                    questionBox = QMessageBox()
-                    answer = questionBox.question(self,"Possibly Deleted Project Detected", f"It appears that the project '{item}' has been removed by other users. Would you like to remove it from local storage?", questionBox.Yes | questionBox.No)
-                    if answer == questionBox.Yes:
-                        shutil.rmtree(full_path)
+        def done(response):
+            if response.status_code != 200:
+                self.showPopupBox("Error Getting Projects","Something went horribly wrong!",QMessageBox.Critical)
+                return
+            project_list = response.json()
+            self.existingProjectsList.clear()
+            self.existingProjectsList.addItems(project_list["projects"])
+            for item in os.listdir(str(collare_home)):
+                full_path = os.path.join(str(collare_home),item)
+                if os.path.isdir(full_path) and not item.startswith("."):
+                    if item not in project_list["projects"]:
+                        questionBox = QMessageBox()
+                        answer = questionBox.question(self,"Possibly Deleted Project Detected", f"It appears that the project '{item}' has been removed by other users. Would you like to remove it from local storage?", questionBox.Yes | questionBox.No)
+                        if answer == questionBox.Yes:
+                            shutil.rmtree(full_path)
+        self.runTask("Loading projects ... ",lambda: self.client.get("getprojectlist"),done)
 
     def addProjectUserClickHandler(self):
         selectedItems = self.projectAllUsersView.selectedItems()
@@ -1173,14 +2930,11 @@ class Ui_Dialog(object):
             user_list.append(item.text())
         if user_list:
             data = {"project":self.currentProject,"users":user_list}
-            try:
-                response = requests.post(f'{self.server}/addprojectusers', json=data, auth=(self.username, self.password), verify=self.cert, timeout=(3,40))
-            except:
-                self.showPopupBox("Connection Error","Connection to the server is not working!",QMessageBox.Critical)
-                return
-            if response.status_code != 200:
-                self.showPopupBox("Error Adding Project Users","Something went horribly wrong!",QMessageBox.Critical)
-            self.populateCurrentProjectUserListing()
+            def done(response):
+                if response.status_code != 200:
+                    self.showPopupBox("Error Adding Project Users","Something went horribly wrong!",QMessageBox.Critical)
+                self.populateCurrentProjectUserListing()
+            self.runTask("Adding project users ... ",lambda: self.client.post("addprojectusers", json=data),done)
 
     def deleteProjectUserClickHandler(self):
         selectedItems = self.projectCurrentUsersView.selectedItems()
@@ -1189,14 +2943,11 @@ class Ui_Dialog(object):
             user_list.append(item.text())
         if user_list:
             data = {"project":self.currentProject,"users":user_list}
-            try:
-                response = requests.post(f'{self.server}/deleteprojectuser', json=data, auth=(self.username, self.password), verify=self.cert, timeout=(3,40))
-            except:
-                self.showPopupBox("Connection Error","Connection to the server is not working!",QMessageBox.Critical)
-                return
-            if response.status_code != 200:
-                self.showPopupBox("Error Deleting Project Users","Something went horribly wrong!",QMessageBox.Critical)
-            self.populateCurrentProjectUserListing()
+            def done(response):
+                if response.status_code != 200:
+                    self.showPopupBox("Error Deleting Project Users","Something went horribly wrong!",QMessageBox.Critical)
+                self.populateCurrentProjectUserListing()
+            self.runTask("Removing project users ... ",lambda: self.client.post("deleteprojectuser", json=data),done)
 
     def deleteGlobalUsersHandler(self):
         if self.username != "admin":
@@ -1208,81 +2959,30 @@ class Ui_Dialog(object):
             user_list.append(item.text())
         if user_list:
             data = {"users":user_list}
-            try:
-                response = requests.post(f'{self.server}/deluser', json=data, auth=(self.username, self.password), verify=self.cert, timeout=(3,40))
-            except:
-                self.showPopupBox("Connection Error","Connection to the server is not working!",QMessageBox.Critical)
-                return
-            if response.status_code != 200:
-                self.showPopupBox("Error Deleting Global Users","Something went horribly wrong!",QMessageBox.Critical)
-            self.populateAllUserListings()
-            self.populateCurrentProjectUserListing()
+            def done(response):
+                if response.status_code != 200:
+                    self.showPopupBox("Error Deleting Global Users","Something went horribly wrong!",QMessageBox.Critical)
+                self.populateAllUserListings()
+                self.populateCurrentProjectUserListing()
+            self.runTask("Deleting users ... ",lambda: self.client.post("deluser", json=data),done)
 
     def doesToolExist(self,tool):
-        if tool == "i64" and self.which("ida64"):
-            return True
-        if tool == "idb" and self.which("ida"):
-            return True
-        if tool == "bndb" and self.which("binaryninja"):
-            return True
-        if tool == "hop" and self.which("Hopper"):
-            return True
-        if tool == "rzdb" and self.which("Cutter"):
-            return True
-        if tool == "ghdb" and self.which("ghidraRun"):
-            return True
-        if tool == "jdb2" and self.which("jeb"):
-            return True
-        if tool == "asp" and self.which("android-studio"):
-            return True
-        return False
-
-    def refreshProjectTree(self):
-        self.projectTreeView.clear()
-        def fill_item(item,value):
-            if type(value) is dict:
-                for key, val in sorted(value.items()):
-                    child = QTreeWidgetItem()
-                    if key == "__file__type__" or key == "__locked__" or  key == "__rev_dbs__":
-                        continue
-                    if type(val) is dict:
-                        if val["__file__type__"] == True:
-                            if val["__locked__"]:
-                                node_name = f"{key}"
-                                #child.setText(1, (f"(checked-out by '{val['__locked__']}')"))
-                            else:
-                                node_name = key
-                            icon = QIcon(os.path.join(current_running_file_dir,"icons","binary.png"))
-                            child.setIcon(0,icon)
-                            child.setWhatsThis(0,"binary")
-                            for rev_db in val["__rev_dbs__"]:
-                                rev_db_node = QTreeWidgetItem()
-                                rev_db_node.setText(0,rev_db)
-                                if val["__rev_dbs__"][rev_db]['checked-out']:
-                                    rev_db_node.setText(1, (f"Checked-out by '{val['__rev_dbs__'][rev_db]['checked-out']}'"))
-                                if not self.doesToolExist(rev_db):
-                                    rev_db_node.setDisabled(True)
-                                rev_db_node.setIcon(0,QtGui.QIcon(os.path.join(current_running_file_dir,"icons",f"{rev_db}.png")))
-                                rev_db_node.setWhatsThis(0,"db")
-                                child.addChild(rev_db_node)
-                        elif val["__file__type__"] == False:
-                            node_name = key
-                            icon = QIcon(os.path.join(current_running_file_dir,"icons","folder.png"))
-                            child.setIcon(0,icon)
-                            child.setWhatsThis(0,"folder")
-                            item.setExpanded(True)
-                        else:
-                            node_name = key
-                        child.setText(0, (node_name))
-                        
-                        item.addChild(child)
-                        fill_item(child, val)
-            else:
-                child = QTreeWidgetItem()
-                child.setText(0, (value))
-                item.addChild(child)
-        fill_item(self.projectTreeView.invisibleRootItem(),self.currentProjectManifest)
-        
+        return self.tools.hasDBTool(tool)
+
+    def treeIcon(self,name):
+        # Icons are loaded from disk once
+        if name not in self.treeIcons:
+            self.treeIcons[name] = QIcon(os.path.join(current_running_file_dir,"icons",f"{name}.png"))
+        return self.treeIcons[name]
+
+    def refreshProjectTree(self,paths=None):
+        # Reconciles the tree with the manifest, only expanded parts of the tree exist as nodes
+        # 'paths' are the entries changed in place, without them the whole manifest was replaced
+        created = self.projectTreeView.model().sync(self.currentProjectManifest,paths)
+        for node in created:
+            # Show the content of a newly opened project
+            self.projectTreeView.expand(self.projectTreeView.model().indexFor(node))
+        self.saveSnapshot()
 
     def connectClickHandler(self):
         if self.connectButton.text() == "Connect":
@@ -1295,23 +2995,29 @@ class Ui_Dialog(object):
             if not self.server or not self.username or not self.password or not self.cert:
                 self.showPopupBox("Cannot Initiate Connection","Please make sure that all fields are filled!",QMessageBox.Critical)
                 return
-            try:
-                response = requests.get(f'{self.server}/ping', auth=(self.username, self.password), verify=self.cert, timeout=(3,40))
-            except requests.exceptions.SSLError:
-                self.showPopupBox("Cannot Initiate Connection","Certificate validation failure. Make sure that the hostname in the \"Server\" field matches the one in the certificate!",QMessageBox.Critical)
-                return
-            except requests.exceptions.ConnectionError:
-                self.showPopupBox("Cannot Initiate Connection","Cannot reach the server!",QMessageBox.Critical)
-                return
-            except:
-                self.showPopupBox("Cannot Initiate Connection","Connection not successful! Check provided data and try again!",QMessageBox.Critical)
-                return
-            if response.text == "SUCCESS":
-                self.onSuccessConnect()
-                self.storeConnectionDetails(self.server,self.username,self.cert)
-            else:
-                self.showPopupBox("Cannot Initiate Connection","Login failed!",QMessageBox.Critical)
-                return
+            if self.client:
+                self.client.close()
+            self.client = CollaREClient(self.server,self.username,self.password,self.cert,self.settings)
+            client = self.client
+            def work():
+                response = client.get("ping")
+                if response.text == "SUCCESS":
+                    client.loadCapabilities()
+                return response
+            def done(response):
+                if response.text == "SUCCESS":
+                    self.onSuccessConnect()
+                    self.storeConnectionDetails(self.server,self.username,self.cert)
+                else:
+                    self.showPopupBox("Cannot Initiate Connection","Login failed!",QMessageBox.Critical)
+            def error(exception):
+                if isinstance(exception,requests.exceptions.SSLError):
+                    self.showPopupBox("Cannot Initiate Connection","Certificate validation failure. Make sure that the hostname in the \"Server\" field matches the one in the certificate!",QMessageBox.Critical)
+                elif isinstance(exception,requests.exceptions.ConnectionError):
+                    self.showPopupBox("Cannot Initiate Connection","Cannot reach the server!",QMessageBox.Critical)
+                else:
+                    self.showPopupBox("Cannot Initiate Connection","Connection not successful! Check provided data and try again!",QMessageBox.Critical)
+            self.runTask("Connecting ... ",work,done,error)
         else:
             self.onDisconnect()
         
@@ -1468,7 +3174,6 @@ class Ui_Dialog(object):
         self.projectTreeView.setGeometry(QtCore.QRect(10, 10, 961, 671))
         self.projectTreeView.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)  
         self.projectTreeView.customContextMenuRequested.connect(self.rightClickMenuHandle)  
-        self.projectTreeView.setHeaderItem(QTreeWidgetItem(["File","Status"]))
         self.projectTreeView.setColumnWidth(0,500)
         self.projectTreeView.setDragEnabled(True)
         projectLayout.addWidget(self.projectTreeView)
@@ -1612,10 +3317,39 @@ class Ui_Dialog(object):
         self.currentProjectAddUsersButton.clicked.connect(self.addProjectUserClickHandler)
         self.currentProjectRemoveUsersButton.clicked.connect(self.deleteProjectUserClickHandler)
         self.changePasswordButton.clicked.connect(self.changePasswordClickHandler)
-        self.projectTreeView.itemDoubleClicked.connect(self.openDoubleClickWrapper)
+        self.projectTreeView.doubleClicked.connect(self.openDoubleClickWrapper)
         self.deleteGlobalUsersButton.clicked.connect(self.deleteGlobalUsersHandler)
         
 
+        self.settings = load_settings()
+        self.client = None
+        self.activeTasks = []
+        self.tasks = set()
+        self.currentProjectRevision = None
+        self.currentProject = None
+        self.connected = False
+        self.eventListener = None
+        self.refreshForced = False
+        self.refreshRevision = None
+        self.optimisticChanges = []
+        self.refreshInFlight = False
+        self.refreshStats = {"requested":0,"fetched":0,"coalesced":0,"skipped":0}
+        self.refreshTimer = QTimer()
+        self.refreshTimer.setSingleShot(True)
+        self.refreshTimer.timeout.connect(self.runScheduledRefresh)
+        self.snapshotInFlight = False
+        self.snapshotPending = False
+        self.snapshotTimer = QTimer()
+        self.snapshotTimer.setSingleShot(True)
+        self.snapshotTimer.timeout.connect(self.writeSnapshot)
+        self.currentProjectManifest = {}
+        self.manifestIndex = ManifestIndex({})
+        self.treeIcons = {}
+        self.blobCache = BlobCache(collare_cache,self.settings["cache_size_mb"] * 1024 * 1024)
+        self.quarantine = Quarantine(collare_quarantine,self.settings["quarantine_size_mb"] * 1024 * 1024)
+        # Tools are looked up in the background so that the window shows up right away
+        self.tools = ToolRegistry()
+        self.runTask("Looking for tools ... ",self.tools.scan,lambda result: self.projectTreeView.model().updateToolAvailability())
         self.prepopulateConnect()
         # SAVE THIS
 
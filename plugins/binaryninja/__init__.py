@@ -1,8 +1,111 @@
 from binaryninja import *
-import os, json
+import os, json, bisect
 
 imported = False
 
+def functions_by_address(bv,addresses):
+	# Functions containing each of the (sorted) addresses, built from the basic block ranges in one pass over all functions
+	index = {}
+	for function in bv.functions:
+		for block in function.basic_blocks:
+			position = bisect.bisect_left(addresses,block.start)
+			while position < len(addresses) and addresses[position] < block.end:
+				functions = index.setdefault(addresses[position],[])
+				if function not in functions:
+					functions.append(function)
+				position += 1
+	return index
+
+class CollaREImportTask(BackgroundTaskThread):
+	def __init__(self,bv,changes):
+		BackgroundTaskThread.__init__(self,"CollaRE: Importing changes ...",True)
+		self.bv = bv
+		self.changes = changes
+
+	def run(self):
+		bv = self.bv
+		changes = self.changes
+		base = changes["base"]
+		if base != bv.start:
+			base = bv.start - base
+		else:
+			base = 0
+		# All edits are one undo action and the analysis runs once at the end
+		if hasattr(bv,"set_analysis_hold"):
+			bv.set_analysis_hold(True)
+		undo_state = bv.begin_undo_actions()
+		try:
+			self.progress = "CollaRE: Indexing functions ..."
+			comments = {int(comment,10) + base:value for comment, value in changes["comments"].items()}
+			containing = functions_by_address(bv,sorted(comments))
+			function_comments = {}
+			for count, (comment_address, comment) in enumerate(comments.items()):
+				if self.cancelled:
+					break
+				if count % 1000 == 0:
+					self.progress = f"CollaRE: Importing comments ({count}/{len(comments)}) ..."
+				if not comment in bv.get_comment_at(comment_address):
+					current_comment = bv.get_comment_at(comment_address)
+					for function in containing.get(comment_address,[]):
+						if function.start not in function_comments:
+							function_comments[function.start] = function.comments
+						function_comment = function_comments[function.start].get(comment_address,"")
+						if function_comment and current_comment:
+							current_comment += "; " + function_comment
+						else:
+							current_comment = function_comment
+
+						if current_comment in comment:
+							bv.set_comment_at(comment_address,"")
+							function.set_comment_at(comment_address,"")
+							function.set_comment_at(comment_address,comment)
+						elif comment in current_comment:
+							pass
+						else:
+							function.set_comment_at(comment_address,current_comment + "; "+ comment)
+			for count, function in enumerate(changes["function_names"]):
+				if self.cancelled:
+					break
+				if count % 1000 == 0:
+					self.progress = f"CollaRE: Importing function names ({count}/{len(changes['function_names'])}) ..."
+				function_address = int(function,10) + base
+				if bv.get_function_at(function_address):
+					bv.get_function_at(function_address).name = changes["function_names"][function]["name"]
+		finally:
+			if undo_state is not None:
+				bv.commit_undo_actions(undo_state)
+			else:
+				bv.commit_undo_actions()
+			if hasattr(bv,"set_analysis_hold"):
+				bv.set_analysis_hold(False)
+			bv.update_analysis()
+		if self.cancelled:
+			show_message_box("CollaRE Import", "Import was cancelled, part of the changes was imported.", buttons=0, icon=2)
+		else:
+			show_message_box("CollaRE Import", "Import successful!", buttons=0, icon=0)
+
+class CollaREExportTask(BackgroundTaskThread):
+	def __init__(self,bv):
+		BackgroundTaskThread.__init__(self,"CollaRE: Exporting changes ...",True)
+		self.bv = bv
+
+	def run(self):
+		bv = self.bv
+		changes = {"function_names":{},"comments":{},"base":bv.start}
+		functions = list(bv.functions)
+		for count, function in enumerate(functions):
+			if self.cancelled:
+				return
+			if count % 1000 == 0:
+				self.progress = f"CollaRE: Exporting functions ({count}/{len(functions)}) ..."
+			changes["comments"].update(function.comments)
+			# Avoid storing default names that contain function address
+			if hex(function.start)[2:] not in function.name:
+				changes["function_names"][function.start] = {"name":function.name,"end":function.highest_address}
+		with open(os.path.join(os.path.dirname(bv.file.filename),"changes.json"),"w") as changes_file:
+			json.dump(changes,changes_file)
+		show_message_box("Export Successful", "Comments and function names exported. Please check-in the DB file to push the changes to the server.", buttons=0, icon=0)
+
 def import_changes(bv):
 	# Check if we are working with CollaRE project
 	if not ".collare_projects" in bv.file.filename:
@@ -10,34 +113,7 @@ def import_changes(bv):
 		return
 	with open(os.path.join(os.path.dirname(bv.file.filename),"changes.json"),"r") as changes_file:
 		changes = json.load(changes_file)
-		base = changes["base"]
-		if base != bv.start:
-			base = bv.start - base
-		else:
-			base = 0
-		for comment in changes["comments"]:
-			comment_address = int(comment,10) + base
-			if not changes["comments"][comment] in bv.get_comment_at(comment_address):
-				current_comment = bv.get_comment_at(comment_address)
-				for function in bv.get_functions_containing(comment_address):
-					if function.get_comment_at(comment_address) and current_comment:
-						current_comment += "; " + function.get_comment_at(comment_address)
-					else:
-						current_comment = function.get_comment_at(comment_address)
-					
-					if current_comment in changes["comments"][comment]:
-						bv.set_comment_at(comment_address,"")
-						function.set_comment_at(comment_address,"")
-						function.set_comment_at(comment_address,changes["comments"][comment])
-					elif changes["comments"][comment] in current_comment:
-						pass
-					else:
-						function.set_comment_at(comment_address,current_comment + "; "+ changes["comments"][comment])
-		for function in changes["function_names"]:
-			function_address = int(function,10) + base
-			if bv.get_function_at(function_address):
-				bv.get_function_at(function_address).name = changes["function_names"][function]["name"]
-	show_message_box("CollaRE Import", "Import successful!", buttons=0, icon=0)
+	CollaREImportTask(bv,changes).start()
 
 
 
@@ -50,15 +126,7 @@ def export_changes(bv):
 	result = show_message_box("Import not performed in this session", "It is strongly suggested to first perform an import before exporting any data. Would you like to continue?", buttons=1, icon=0)
 	if result == 0:
 		return
-	changes = {"function_names":{},"comments":{},"base":bv.start}
-	for function in bv.functions:
-		changes["comments"].update(function.comments)
-		# Avoid storing default names that contain function address
-		if hex(function.start)[2:] not in function.name:
-			changes["function_names"][function.start] = {"name":function.name,"end":function.highest_address}
-	with open(os.path.join(os.path.dirname(bv.file.filename),"changes.json"),"w") as changes_file:
-		json.dump(changes,changes_file)
-	show_message_box("Export Successful", "Comments and function names exported. Please check-in the DB file to push the changes to the server.", buttons=0, icon=0)
+	CollaREExportTask(bv).start()
 
 
 
@@ -1,6 +1,12 @@
 import cutter, json, os
 from PySide2.QtWidgets import QAction, QLabel, QPushButton, QMessageBox
 
+# Characters with a meaning for the rizin shell, escaped so that names and comments are never run as commands
+shell_special = set('\\@;#|><`$()"\'~!{}[]')
+
+def escape_arg(text):
+    return "".join("\\" + char if char in shell_special else char for char in text)
+
 class CollaREExport(cutter.CutterPlugin):
     name = "CollaRE Export"
     description = "This plugin allows sharing the data for CollaRE projects"
@@ -27,17 +33,14 @@ class CollaREExport(cutter.CutterPlugin):
         if ".collare_projects" in project_path:
             base_addr = int(json.loads(cutter.cmd("iSj"))[0]["vaddr"])
             changes = {"function_names":{},"comments":{},"base":base_addr}
-            functions = cutter.cmd("afij @@F")
-            functions = functions.replace("]\n[",",")
-            functions = json.loads(functions)
+            # One call for all functions and one for all comments
+            functions = cutter.cmdj("aflj") or []
             for function in functions:
                 if hex(function["offset"])[2:] not in function["name"]:
                     # Non-default function names
                     changes["function_names"][function["offset"]] = {"name":function["name"],"end":function["offset"]+function["size"]}
 
-            comments = cutter.cmd("CCfj @@F")
-            comments = comments.replace("[]\n","").replace("]\n[",",")
-            comments = json.loads(comments)
+            comments = cutter.cmdj("CCj") or []
             for comment in comments:
                 changes["comments"][comment["offset"]] = comment["name"]
             with open(os.path.join(os.path.dirname(project_path),"changes.json"),"w") as changes_file:
@@ -46,16 +49,34 @@ class CollaREExport(cutter.CutterPlugin):
         else:
             QMessageBox.warning(self.main, "CollaRE", "Not a CollaRE project!", QMessageBox.Ok)
 
-    def get_comment_at(self,address):
-        return cutter.cmd(f"CC.{hex(address)}").rstrip()
+    def get_comments(self):
+        # All comments of the program by address, read with a single command
+        return {int(comment["offset"]):comment["name"] for comment in cutter.cmdj("CCj") or []}
 
-    def set_comment_at(self,address,comment):
-        escaped_at = "\\@"
-        escaped_semi = "\\;"
-        cutter.cmd(f'CCa {hex(address)} {comment.replace("@",escaped_at).replace(";",escaped_semi)}')
+    def set_comment_at(self,commands,address,comment):
+        if "\n" in comment or "\r" in comment:
+            # A script line cannot hold a line break, these are set without going through the shell
+            self.direct_comments.append((address,comment))
+            return
+        commands.append(f"CCa {hex(address)} {escape_arg(comment)}")
 
-    def rename_function(self,address,new_name):
-        cutter.cmd(f"s {hex(address)}; afn {new_name}")
+    def rename_function(self,commands,address,new_name):
+        if "\n" in new_name or "\r" in new_name:
+            # Not a valid function name in any of the tools
+            return
+        commands.append(f"afn {escape_arg(new_name)} @ {hex(address)}")
+
+    def run_script(self,project_path,commands):
+        # Commands are run as one rizin script instead of a round trip per command
+        script_path = os.path.join(os.path.dirname(project_path),"collare_import.rz")
+        with open(script_path,"w") as script_file:
+            script_file.write("\n".join(commands) + "\n")
+        try:
+            cutter.cmd(f'. "{script_path}"')
+        finally:
+            os.remove(script_path)
+        for address, comment in self.direct_comments:
+            cutter.core().setComment(address,comment)
 
     def collare_import(self):
         project_path = cutter.cmd("e prj.file")
@@ -63,24 +84,31 @@ class CollaREExport(cutter.CutterPlugin):
             with open(os.path.join(os.path.dirname(project_path),"changes.json"),"r") as changes_file:
                 changes = json.load(changes_file)
                 base = changes["base"]
-                if base != int(json.loads(cutter.cmd("iSj"))[0]["vaddr"]):
-                    base = int(json.loads(cutter.cmd("iSj"))[0]["vaddr"]) - base
+                base_addr = int(json.loads(cutter.cmd("iSj"))[0]["vaddr"])
+                if base != base_addr:
+                    base = base_addr - base
                 else:
                     base = 0
+                current_comments = self.get_comments()
+                commands = []
+                self.direct_comments = []
                 for comment in changes["comments"]:
                     comment_address = int(comment,10) + base
-                    current_comment = self.get_comment_at(comment_address)
+                    current_comment = current_comments.get(comment_address,"").rstrip()
                     if current_comment:
-                        if self.get_comment_at(comment_address) in changes["comments"][comment]:
-                            self.set_comment_at(comment_address,changes["comments"][comment])
+                        if current_comment == changes["comments"][comment]:
+                            pass
+                        elif current_comment in changes["comments"][comment]:
+                            self.set_comment_at(commands,comment_address,changes["comments"][comment])
                         elif changes["comments"][comment] in current_comment:
                             pass
                         else:
-                            self.set_comment_at(comment_address,current_comment + "; " + changes["comments"][comment])
+                            self.set_comment_at(commands,comment_address,current_comment + "; " + changes["comments"][comment])
                     else:
-                        self.set_comment_at(comment_address,changes["comments"][comment])
+                        self.set_comment_at(commands,comment_address,changes["comments"][comment])
                 for function in changes["function_names"]:
-                    self.rename_function(int(function,10) + base,changes["function_names"][function]["name"])
+                    self.rename_function(commands,int(function,10) + base,changes["function_names"][function]["name"])
+                self.run_script(project_path,commands)
             QMessageBox.information(self.main, "CollaRE", "Import Done!", QMessageBox.Ok)
         else:
             QMessageBox.warning(self.main, "CollaRE", "Not a CollaRE project!", QMessageBox.Ok)
@@ -5,7 +5,8 @@
 #@menupath Tools.CollaRE.Export
 #@toolbar 
 
-import os, json
+import os, json, time
+from ghidra.program.model.symbol import SourceType, SymbolType
 
 
 def get_comments(address):
@@ -32,27 +33,34 @@ def get_comments(address):
 
 
 changes = {"function_names":{},"comments":{},"base": int(currentProgram.getImageBase().getOffset())}
-project_dir = getProjectRootFolder().getProjectLocator().getLocation()
+# Headless mode: analyzeHeadless <project_location> <project_name> -process <file> -postScript CollaREExport.py [<output_dir>]
+script_args = getScriptArgs()
+project_dir = script_args[0] if script_args else getProjectRootFolder().getProjectLocator().getLocation()
 if ".collare_projects" in project_dir:
-    # Functions
-    current_function = getFirstFunction()
-    while current_function != None:
-        address = int(current_function.getEntryPoint().getOffset())
-        if hex(address)[2:] not in current_function.getName():
-            changes["function_names"][str(address)] = {"name":current_function.getName(),"end":0}
-        current_function = getFunctionAfter(current_function)
-    # Comments
-    current_instruction = getFirstInstruction()
-    while current_instruction != None:
-        address = current_instruction.getAddress()
-        # Only works for PRE comments as doing it for everything would be insane mess
+    start = time.time()
+    memory = currentProgram.getMemory()
+    # Functions, only the symbols named by the user or imported with the binary. Default 'FUN_' functions are records of the
+    # same table and it has no iterator by source, their source is checked before the name so that no default name is built
+    for symbol in currentProgram.getSymbolTable().getSymbols(memory,SymbolType.FUNCTION,True):
+        if symbol.getSource() == SourceType.DEFAULT:
+            continue
+        address = int(symbol.getAddress().getOffset())
+        if hex(address)[2:] not in symbol.getName():
+            changes["function_names"][str(address)] = {"name":symbol.getName(),"end":0}
+    # Comments, only the addresses that have one
+    for address in currentProgram.getListing().getCommentAddressIterator(memory,True):
         comment = get_comments(address)
         if comment:
             changes["comments"][str(address.getOffset())] = comment
-        current_instruction = getInstructionAfter(current_instruction)
     with open(os.path.join(project_dir,"changes.json"),"w") as changes_file:
         json.dump(changes,changes_file)
     
-    popup("[*] Export successful!")
+    message = "[*] Export successful! (%.2f s, %d function names, %d comments)" % (time.time() - start,len(changes["function_names"]),len(changes["comments"]))
+    if isRunningHeadless():
+        println(message)
+    else:
+        popup(message)
+elif isRunningHeadless():
+    println("[!] This is not CollaRE project!")
 else:
     popup("[!] This is not CollaRE project!")
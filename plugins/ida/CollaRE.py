@@ -3,7 +3,8 @@ from idaapi import *
 import idaapi
 from idc import *
 import ida_nalt
-import os, json
+import ida_bytes
+import os, json, time, hashlib
 
 def get_comment(ea):
     comment = ""
@@ -27,6 +28,122 @@ def get_comment(ea):
         comment += nonRepFunComment
     return comment
 
+def get_item_comment(ea):
+    # Regular and repeatable comment of the item only, without the comment of the function it belongs to
+    comment = ""
+    repComment = get_cmt(ea, True)
+    nonRepComment = get_cmt(ea, False)
+    if repComment:
+        comment += repComment
+    if nonRepComment:
+        if comment:
+            comment += "; "
+        comment += nonRepComment
+    return comment
+
+def commented_heads(start,end):
+    # Items between start and end that have a regular or repeatable comment, IDA skips the other items itself
+    ea = start
+    if not ida_bytes.has_cmt(ida_bytes.get_flags(ea)):
+        ea = ida_bytes.next_that(ea,end,ida_bytes.has_cmt)
+    while ea != BADADDR and ea < end:
+        yield ea
+        ea = ida_bytes.next_that(ea,end,ida_bytes.has_cmt)
+
+def export_comment(ea):
+    # Function comments are exported at the function start
+    func = get_func(ea)
+    if func and func.start_ea == ea:
+        return get_comment(ea)
+    return get_item_comment(ea)
+
+def export_function_name(ea):
+    # Name of the function starting at ea when it was named by the user, None otherwise
+    func = get_func(ea)
+    if not func or func.start_ea != ea:
+        return None
+    functionName = get_func_name(ea)
+    if hex(ea)[2:].upper() in functionName:
+        return None
+    return functionName
+
+def project_path(name):
+    return os.path.join(os.path.dirname(ida_nalt.get_input_file_path()),name)
+
+def diff_changes(old,new):
+    # Delta between two changes.json contents, this is what the CollaRE client uploads on check-in
+    delta = {"base":new["base"],"function_names":{},"comments":{},"removed":{"function_names":[],"comments":[]}}
+    for kind in ["function_names","comments"]:
+        for ea, value in new[kind].items():
+            if old[kind].get(ea) != value:
+                delta[kind][ea] = value
+        for ea in old[kind]:
+            if ea not in new[kind]:
+                delta["removed"][kind].append(ea)
+    return delta
+
+def merge_delta(delta,newer):
+    # Deltas of subsequent exports are combined so that the delta always covers everything since the check-out
+    for kind in ["function_names","comments"]:
+        for ea, value in newer[kind].items():
+            delta[kind][ea] = value
+            if ea in delta["removed"][kind]:
+                delta["removed"][kind].remove(ea)
+        for ea in newer["removed"][kind]:
+            delta[kind].pop(ea,None)
+            if ea not in delta["removed"][kind]:
+                delta["removed"][kind].append(ea)
+    delta["base"] = newer["base"]
+    return delta
+
+class CollaREJournal(idaapi.IDB_Hooks):
+    # Records the addresses of renames and comment changes into an append-only journal next to the DB
+    # The next export reads back only these addresses instead of scanning the whole database
+    def __init__(self):
+        idaapi.IDB_Hooks.__init__(self)
+        self.journal = None
+
+    def record(self,kind,ea):
+        if ".collare_projects" not in ida_nalt.get_input_file_path():
+            return
+        if self.journal is None:
+            if not os.path.exists(project_path("changes.journal")):
+                # Journal is created by a full export, without it the next export scans the database anyway
+                return
+            self.journal = open(project_path("changes.journal"),"a")
+        self.journal.write(json.dumps({"kind":kind,"ea":int(ea)}) + "\n")
+        # Recorded addresses have to survive a crash of IDA, the next export trusts the journal
+        self.journal.flush()
+
+    def flush(self):
+        if self.journal:
+            self.journal.close()
+            self.journal = None
+
+    def renamed(self, ea, new_name, *args):
+        self.record("name",ea)
+        return 0
+
+    def func_added(self, pfn):
+        self.record("name",pfn.start_ea)
+        return 0
+
+    def deleting_func(self, pfn):
+        self.record("name",pfn.start_ea)
+        self.record("comment",pfn.start_ea)
+        return 0
+
+    def cmt_changed(self, ea, repeatable_cmt):
+        self.record("comment",ea)
+        return 0
+
+    def range_cmt_changed(self, kind, a, cmt, repeatable):
+        if kind == idaapi.RANGE_KIND_FUNC:
+            self.record("comment",a.start_ea)
+        return 0
+
+journal_hooks = CollaREJournal()
+
 def clear_comments(ea):
     set_cmt(ea,"",False)
     set_cmt(ea,"",True)
@@ -40,27 +157,100 @@ class CollaREExportAction(idaapi.action_handler_t):
     def activate(self, ctx):
         print("[CollaRE] Exporting ...")
         if ".collare_projects" in ida_nalt.get_input_file_path():
-            changes = {"function_names":{},"comments":{},"base": int(idaapi.get_imagebase())}
-            for segea in Segments():
-                for funcea in Functions(segea):
-                    # Name
-                    functionName = get_func_name(funcea)
-                    if hex(funcea)[2:].upper() not in functionName:
-                        changes["function_names"][int(funcea)] = {"name":functionName,"end":0}
-                for ea in range(segea,get_segm_end(segea)):
-                    comment = get_comment(ea)
-                    if comment:
-                        changes["comments"][ea] = comment 
-                
-                with open(os.path.join(os.path.dirname(ida_nalt.get_input_file_path()),"changes.json"),"w") as changes_file:
-                    json.dump(changes,changes_file)
-
-            print("[CollaRE] Export completed!")
+            start = time.perf_counter()
+            journal_hooks.flush()
+            old_changes, old_content = None, None
+            if os.path.exists(project_path("changes.json")):
+                with open(project_path("changes.json"),"rb") as changes_file:
+                    old_content = changes_file.read()
+                old_changes = json.loads(old_content)
+            if old_changes is not None and old_changes["base"] == int(idaapi.get_imagebase()) and os.path.exists(project_path("changes.journal")):
+                changes, delta = self.exportJournal(old_changes)
+            else:
+                changes = self.exportAll()
+                delta = diff_changes(old_changes,changes) if old_changes is not None and old_changes["base"] == changes["base"] else None
+            content = json.dumps(changes).encode("utf-8")
+            # changes.json is shared with the DBs of other tools, the client uploads the delta only for this DB and only
+            # while changes.json is still the one written here
+            db_name = os.path.splitext(get_idb_path())[1][1:]
+            if delta is not None and os.path.exists(project_path("changes.delta.json")):
+                with open(project_path("changes.delta.json"),"r") as delta_file:
+                    previous = json.load(delta_file)
+                if previous.get("db") == db_name and previous.get("changes_hash") == hashlib.sha256(old_content).hexdigest():
+                    delta = merge_delta(previous,delta)
+                else:
+                    # Another tool exported in between, the deltas do not add up to the changes since the check-out
+                    delta = None
+            elif delta is not None:
+                delta["base_hash"] = hashlib.sha256(old_content).hexdigest()
+            if delta is not None:
+                delta["db"] = db_name
+                delta["changes_hash"] = hashlib.sha256(content).hexdigest()
+                with open(project_path("changes.delta.json"),"w") as delta_file:
+                    json.dump(delta,delta_file)
+            elif os.path.exists(project_path("changes.delta.json")):
+                # The client uploads the whole changes.json
+                os.remove(project_path("changes.delta.json"))
+
+            with open(project_path("changes.json"),"wb") as changes_file:
+                changes_file.write(content)
+            # Journal starts empty, from now on only the edits are exported
+            open(project_path("changes.journal"),"w").close()
+
+            print(f"[CollaRE] Export completed in {time.perf_counter() - start:.2f} s ({len(changes['function_names'])} function names, {len(changes['comments'])} comments)!")
             idaapi.info("CollaRE Export completed!")
         else:
             print("[CollaRE] Export failed! Not a CollaRE project!")
             idaapi.warning("This is not a CollaRE project!")
         return 1
+
+    def exportJournal(self,changes):
+        # Only the addresses recorded since the last export are read back, keys are strings as in the loaded changes.json
+        # 'changes' is updated in place and the delta is built from the same addresses while the old values are still there
+        names, comments = set(), set()
+        with open(project_path("changes.journal"),"r") as journal_file:
+            for line in journal_file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Line cut short when IDA was closed
+                    continue
+                (names if entry["kind"] == "name" else comments).add(entry["ea"])
+        delta = {"base":changes["base"],"function_names":{},"comments":{},"removed":{"function_names":[],"comments":[]}}
+        for kind, addresses, export in [("function_names",names,export_function_name),("comments",comments,export_comment)]:
+            for ea in addresses:
+                value = export(ea)
+                if value and kind == "function_names":
+                    value = {"name":value,"end":0}
+                if value:
+                    if changes[kind].get(str(ea)) != value:
+                        delta[kind][str(ea)] = value
+                    changes[kind][str(ea)] = value
+                elif str(ea) in changes[kind]:
+                    delta["removed"][kind].append(str(ea))
+                    del changes[kind][str(ea)]
+        return changes, delta
+
+    def exportAll(self):
+        changes = {"function_names":{},"comments":{},"base": int(idaapi.get_imagebase())}
+        for segea in Segments():
+            segend = get_segm_end(segea)
+            # Only commented items are visited, not every byte of the segment
+            for ea in commented_heads(segea,segend):
+                comment = get_item_comment(ea)
+                if comment:
+                    changes["comments"][int(ea)] = comment
+            for funcea in Functions(segea,segend):
+                # Name
+                functionName = get_func_name(funcea)
+                if hex(funcea)[2:].upper() not in functionName:
+                    changes["function_names"][int(funcea)] = {"name":functionName,"end":0}
+                # Function comments are exported at the function start
+                comment = get_comment(funcea)
+                if comment:
+                    changes["comments"][int(funcea)] = comment
+        # Same string keys as a loaded changes.json
+        return json.loads(json.dumps(changes))
     
     # This action is always available.
     def update(self, ctx):
@@ -136,12 +326,15 @@ class collare_t(idaapi.plugin_t):
         
         idaapi.register_action(import_desc)
         idaapi.attach_action_to_menu("File/Save as...", "collare:import", idaapi.SETMENU_APP)
+        journal_hooks.hook()
+        return idaapi.PLUGIN_KEEP
         
     def run(self):
         pass
 
     def term(self):
-        pass
+        journal_hooks.unhook()
+        journal_hooks.flush()
 
 def PLUGIN_ENTRY():
     return collare_t()
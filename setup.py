@@ -19,6 +19,9 @@ setup(
     install_requires=[
         'PyQt5',
         'requests'
-    ]
+    ],
+    extras_require={
+        'zstd': ['zstandard']
+    }
 )
 
@@ -0,0 +1,120 @@
+# Minimal stand-in for the CollaRE server, implements only the resumable transfer protocol described in the README
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import hashlib, json, threading, uuid
+
+stream_content_type = "application/x-collare-stream"
+
+class StandInServer:
+    def __init__(self):
+        self.sessions = {}
+        self.files = {}
+        self.log = []
+        # Index of the chunk that is read but not answered once, as if the connection dropped
+        self.drop_chunk = None
+        # Number of file bytes sent before the first download is cut off
+        self.drop_download_after = None
+        self.corrupt_upload = False
+        self.httpd = ThreadingHTTPServer(("127.0.0.1",0),self.handler())
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever,daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def handler(self):
+        server = self
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self,format,*args):
+                pass
+
+            def body(self):
+                return self.rfile.read(int(self.headers.get("Content-Length",0)))
+
+            def reply(self,status,body,content_type="text/plain",headers={}):
+                if type(body) is not bytes:
+                    body = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type",content_type)
+                self.send_header("Content-Length",str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name,value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {key: value[0] for key, value in parse_qs(url.query).items()}
+                server.log.append(("GET",url.path,params,dict(self.headers)))
+                if url.path == "/upload/status":
+                    session = server.sessions.get(params["session"])
+                    if session is None:
+                        self.reply(404,"SESSION_UNKNOWN")
+                        return
+                    received = 0
+                    while received in session["chunks"]:
+                        received += 1
+                    self.reply(200,json.dumps({"received":received}),"application/json")
+                else:
+                    self.reply(404,"")
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                params = {key: value[0] for key, value in parse_qs(url.query).items()}
+                data = self.body()
+                server.log.append(("POST",url.path,params,dict(self.headers)))
+                if url.path == "/upload/start":
+                    values = json.loads(data)
+                    session_id = uuid.uuid4().hex
+                    server.sessions[session_id] = dict(values,chunks={})
+                    self.reply(200,json.dumps({"session":session_id}),"application/json")
+                elif url.path == "/upload/chunk":
+                    index = int(params["index"])
+                    if index == server.drop_chunk:
+                        server.drop_chunk = None
+                        self.close_connection = True
+                        return
+                    server.sessions[params["session"]]["chunks"][index] = data
+                    self.reply(200,"OK")
+                elif url.path == "/upload/finish":
+                    values = json.loads(data)
+                    session = server.sessions.pop(values["session"])
+                    content = b"".join(session["chunks"][index] for index in sorted(session["chunks"]))
+                    if server.corrupt_upload:
+                        content = content[:-1]
+                    if hashlib.sha256(content).hexdigest() != session["hash"]:
+                        self.reply(200,"HASH_MISMATCH")
+                        return
+                    server.files[values["file_name"]] = content
+                    self.reply(200,"DONE")
+                elif url.path == "/getfile":
+                    values = json.loads(data)
+                    content = server.files[values["file_name"]]
+                    digest = hashlib.sha256(content).hexdigest()
+                    status, offset = 200, 0
+                    if self.headers.get("Range") and self.headers.get("If-Range") == f'"{digest}"':
+                        status, offset = 206, int(self.headers["Range"][len("bytes="):].rstrip("-"))
+                    metadata = (json.dumps({"hash":digest}) + "\n").encode("utf-8")
+                    if server.drop_download_after is not None:
+                        # Full length is announced but the connection closes part way through
+                        sent = content[offset:offset + server.drop_download_after]
+                        server.drop_download_after = None
+                        self.send_response(status)
+                        self.send_header("Content-Type",stream_content_type)
+                        self.send_header("Content-Length",str(len(metadata) + len(content) - offset))
+                        self.end_headers()
+                        self.wfile.write(metadata + sent)
+                        self.wfile.flush()
+                        self.close_connection = True
+                        return
+                    self.reply(status,metadata + content[offset:],stream_content_type)
+                else:
+                    self.reply(404,"")
+        return Handler
@@ -0,0 +1,76 @@
+import importlib.util, os, sys, types
+
+plugin_path = os.path.join(os.path.dirname(__file__),"..","plugins","binaryninja","__init__.py")
+
+class BackgroundTaskThread:
+    def __init__(self,progress,can_cancel):
+        self.progress = progress
+        self.cancelled = False
+
+def load_plugin(monkeypatch):
+    # Stand-in for the parts of the Binary Ninja API the plugin uses at import time
+    binaryninja = types.ModuleType("binaryninja")
+    binaryninja.BackgroundTaskThread = BackgroundTaskThread
+    binaryninja.PluginCommand = types.SimpleNamespace(register=lambda *args: None)
+    binaryninja.messages = []
+    binaryninja.show_message_box = lambda title, text, **kwargs: binaryninja.messages.append(title)
+    binaryninja.__all__ = ["BackgroundTaskThread","PluginCommand","show_message_box"]
+    monkeypatch.setitem(sys.modules,"binaryninja",binaryninja)
+    spec = importlib.util.spec_from_file_location("collare_binaryninja",plugin_path)
+    plugin = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(plugin)
+    return plugin, binaryninja
+
+class Function:
+    def __init__(self,start,end,comments={}):
+        self.start = start
+        self.basic_blocks = [types.SimpleNamespace(start=start,end=end)]
+        self.comments = dict(comments)
+        self.name = f"sub_{start:x}"
+
+    def set_comment_at(self,address,comment):
+        self.comments[address] = comment
+
+class BinaryView:
+    def __init__(self,functions):
+        self.start = 0x1000
+        self.functions = functions
+        self.comments = {}
+
+    def get_comment_at(self,address):
+        return self.comments.get(address,"")
+
+    def set_comment_at(self,address,comment):
+        self.comments[address] = comment
+
+    def get_function_at(self,address):
+        for function in self.functions:
+            if function.start == address:
+                return function
+
+    def begin_undo_actions(self):
+        return "undo"
+
+    def commit_undo_actions(self,state=None):
+        pass
+
+    def update_analysis(self):
+        pass
+
+def test_import_new_comment_inside_function(monkeypatch):
+    plugin, binaryninja = load_plugin(monkeypatch)
+    function = Function(0x1000,0x1100)
+    bv = BinaryView([function])
+    changes = {"base":0x1000,"comments":{str(0x1010):"new comment"},"function_names":{str(0x1000):{"name":"main","end":0x10ff}}}
+    plugin.CollaREImportTask(bv,changes).run()
+    assert function.comments == {0x1010:"new comment"}
+    assert function.name == "main"
+    assert binaryninja.messages == ["CollaRE Import"]
+
+def test_import_merges_with_existing_function_comment(monkeypatch):
+    plugin, binaryninja = load_plugin(monkeypatch)
+    function = Function(0x1000,0x1100,{0x1010:"local"})
+    bv = BinaryView([function])
+    changes = {"base":0x1000,"comments":{str(0x1010):"remote"},"function_names":{}}
+    plugin.CollaREImportTask(bv,changes).run()
+    assert function.comments == {0x1010:"local; remote"}
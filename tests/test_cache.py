@@ -0,0 +1,38 @@
+import hashlib, os, pytest
+
+pytest.importorskip("PyQt5")
+
+from collare import collare
+
+def put(cache,tmp_path,content,mtime,changes=None):
+    (tmp_path / "src").write_bytes(content)
+    digest = cache.put(str(tmp_path / "src"),changes=changes)
+    os.utime(cache.blobPath(digest),(mtime,mtime))
+    return digest
+
+def test_put_and_get(tmp_path):
+    cache = collare.BlobCache(tmp_path / "cache",1000)
+    digest = put(cache,tmp_path,b"a" * 100,1000,b"{}")
+    assert digest == hashlib.sha256(b"a" * 100).hexdigest()
+    assert cache.get(digest,str(tmp_path / "copy"))
+    assert (tmp_path / "copy").read_bytes() == b"a" * 100
+    assert cache.getChanges(digest) == b"{}"
+    assert not cache.get("0" * 64,str(tmp_path / "missing"))
+    assert cache.getChanges("0" * 64) is None
+
+def test_put_with_wrong_digest(tmp_path):
+    cache = collare.BlobCache(tmp_path / "cache",1000)
+    (tmp_path / "src").write_bytes(b"content")
+    assert cache.put(str(tmp_path / "src"),"0" * 64) is None
+    assert os.listdir(tmp_path / "cache") == []
+
+def test_least_recently_used_is_evicted(tmp_path):
+    cache = collare.BlobCache(tmp_path / "cache",350)
+    first = put(cache,tmp_path,b"a" * 100,1000,b"x" * 10)
+    second = put(cache,tmp_path,b"b" * 100,2000)
+    third = put(cache,tmp_path,b"c" * 100,3000)
+    # Reading the oldest entry makes it the most recently used one
+    assert cache.get(first,str(tmp_path / "copy"))
+    put(cache,tmp_path,b"d" * 100,4000)
+    assert sorted(os.listdir(tmp_path / "cache")) == sorted([first,first + ".changes",third,hashlib.sha256(b"d" * 100).hexdigest()])
+    assert not cache.get(second,str(tmp_path / "copy"))
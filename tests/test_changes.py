@@ -0,0 +1,31 @@
+import hashlib, json, pytest
+
+pytest.importorskip("PyQt5")
+
+from collare import collare
+
+def write_delta(folder,db,changes):
+    delta = {"base":0,"function_names":{},"comments":{"16":"hello"},"removed":{"function_names":[],"comments":[]},
+        "db":db,"base_hash":"","changes_hash":hashlib.sha256(changes).hexdigest()}
+    (folder / "changes.delta.json").write_text(json.dumps(delta))
+
+def test_read_changes_delta(tmp_path):
+    changes = b'{"base": 0, "function_names": {}, "comments": {"16": "hello"}}'
+    write_delta(tmp_path,"i64",changes)
+    assert json.loads(collare.base64.b64decode(collare.read_changes_delta(tmp_path,"i64",changes)))["db"] == "i64"
+
+def test_read_changes_delta_of_other_db(tmp_path):
+    changes = b'{"base": 0, "function_names": {}, "comments": {"16": "hello"}}'
+    write_delta(tmp_path,"i64",changes)
+    assert collare.read_changes_delta(tmp_path,"bndb",changes) is None
+
+def test_read_changes_delta_after_other_export(tmp_path):
+    write_delta(tmp_path,"i64",b'{"base": 0, "function_names": {}, "comments": {"16": "hello"}}')
+    assert collare.read_changes_delta(tmp_path,"i64",b'{"base": 0, "function_names": {}, "comments": {}}') is None
+
+def test_write_changes_removes_delta(tmp_path):
+    write_delta(tmp_path,"i64",b"{}")
+    (tmp_path / "changes.journal").write_text("")
+    collare.write_changes(tmp_path,b"{}")
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["changes.json"]
+    assert collare.read_changes_delta(tmp_path,"i64",b"{}") is None
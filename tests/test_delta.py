@@ -0,0 +1,54 @@
+import io, os, random, pytest
+
+pytest.importorskip("PyQt5")
+
+from collare import collare
+
+block_size = 64
+
+def round_trip(tmp_path,base,new):
+    (tmp_path / "base").write_bytes(base)
+    (tmp_path / "new").write_bytes(new)
+    signatures = collare.file_signatures(str(tmp_path / "base"),block_size)
+    ops = list(collare.delta_ops(signatures,str(tmp_path / "new"),block_size))
+    rebuilt = io.BytesIO()
+    collare.apply_delta(str(tmp_path / "base"),io.BytesIO(b"".join(ops)),rebuilt)
+    assert rebuilt.getvalue() == new
+    return ops
+
+def literal_size(ops):
+    return sum(len(op) - 5 for op in ops if op[:1] == b"D")
+
+@pytest.fixture
+def base():
+    return random.Random(1).randbytes(block_size * 100 + 10)
+
+def test_unchanged_file_is_copied(tmp_path,base):
+    ops = round_trip(tmp_path,base,base)
+    # Trailing partial block has no signature
+    assert literal_size(ops) == 10
+    assert [op[:1] for op in ops] == [b"C",b"D",b"E"]
+
+def test_shifted_content_is_found(tmp_path,base):
+    new = base[:1000] + b"inserted" + base[1000:3000] + base[3500:]
+    ops = round_trip(tmp_path,base,new)
+    assert literal_size(ops) < 8 * block_size
+
+def test_new_content(tmp_path,base):
+    round_trip(tmp_path,base,os.urandom(len(base)))
+    round_trip(tmp_path,base,b"")
+    round_trip(tmp_path,b"",base)
+
+def test_delta_against_other_base(tmp_path,base):
+    (tmp_path / "base").write_bytes(base)
+    (tmp_path / "new").write_bytes(base[:1000] + b"changed" + base[1000:])
+    ops = b"".join(collare.delta_ops(collare.file_signatures(str(tmp_path / "base"),block_size),str(tmp_path / "new"),block_size))
+    (tmp_path / "base").write_bytes(base[:2000] + bytes([base[2000] ^ 1]) + base[2001:])
+    with pytest.raises((collare.ChecksumError,ValueError)):
+        collare.apply_delta(str(tmp_path / "base"),io.BytesIO(ops),io.BytesIO())
+
+def test_incomplete_delta(tmp_path,base):
+    (tmp_path / "base").write_bytes(base)
+    ops = b"".join(collare.delta_ops(collare.file_signatures(str(tmp_path / "base"),block_size),str(tmp_path / "base"),block_size))
+    with pytest.raises(ValueError):
+        collare.apply_delta(str(tmp_path / "base"),io.BytesIO(ops[:-33]),io.BytesIO())
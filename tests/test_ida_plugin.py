@@ -0,0 +1,47 @@
+import importlib.util, os, sys, types
+
+plugin_path = os.path.join(os.path.dirname(__file__),"..","plugins","ida","CollaRE.py")
+
+def load_plugin(monkeypatch):
+    # Stand-ins for the IDA modules, only what the plugin needs at import time
+    idaapi = types.ModuleType("idaapi")
+    idaapi.IDB_Hooks = type("IDB_Hooks",(),{"__init__":lambda self: None})
+    idaapi.action_handler_t = type("action_handler_t",(),{"__init__":lambda self: None})
+    idaapi.plugin_t = object
+    idaapi.PLUGIN_KEEP = 2
+    for name, module in [("idaapi",idaapi),("idautils",types.ModuleType("idautils")),("idc",types.ModuleType("idc")),
+            ("ida_nalt",types.ModuleType("ida_nalt")),("ida_bytes",types.ModuleType("ida_bytes"))]:
+        monkeypatch.setitem(sys.modules,name,module)
+    spec = importlib.util.spec_from_file_location("collare_ida",plugin_path)
+    plugin = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(plugin)
+    return plugin
+
+def apply(changes,delta):
+    # What the server does with 'changes_delta'
+    changes = {"base":delta["base"],"function_names":dict(changes["function_names"]),"comments":dict(changes["comments"])}
+    for kind in ["function_names","comments"]:
+        changes[kind].update(delta[kind])
+        for ea in delta["removed"][kind]:
+            changes[kind].pop(ea,None)
+    return changes
+
+checked_out = {"base":0,"function_names":{"16":{"name":"main","end":0}},"comments":{"32":"first","48":"second"}}
+exported = {"base":0,"function_names":{"16":{"name":"entry","end":0},"64":{"name":"helper","end":0}},"comments":{"32":"first"}}
+reexported = {"base":0,"function_names":{"16":{"name":"entry","end":0}},"comments":{"32":"first","48":"second again"}}
+
+def test_diff_changes(monkeypatch):
+    plugin = load_plugin(monkeypatch)
+    delta = plugin.diff_changes(checked_out,exported)
+    assert delta == {"base":0,"function_names":{"16":{"name":"entry","end":0},"64":{"name":"helper","end":0}},"comments":{},
+        "removed":{"function_names":[],"comments":["48"]}}
+    assert apply(checked_out,delta) == exported
+    assert plugin.diff_changes(exported,exported)["removed"] == {"function_names":[],"comments":[]}
+
+def test_merge_delta(monkeypatch):
+    plugin = load_plugin(monkeypatch)
+    delta = plugin.merge_delta(plugin.diff_changes(checked_out,exported),plugin.diff_changes(exported,reexported))
+    # Removed and added again, added and removed again
+    assert delta["removed"] == {"function_names":["64"],"comments":[]}
+    assert delta["comments"] == {"48":"second again"}
+    assert apply(checked_out,delta) == reexported
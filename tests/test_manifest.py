@@ -0,0 +1,95 @@
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from collare import collare
+
+def make_manifest():
+    return {"P":{"f1":{"__file__type__":False,"bin":{"__file__type__":True,"__hash__":"b0","__rev_dbs__":{
+        "i64":{"checked-out":None,"latest":1,"versions":["v0","v1"],"hashes":["h0","h1"]}}}}}}
+
+def test_apply_manifest_changes():
+    manifest = make_manifest()
+    collare.apply_manifest_changes(manifest,[
+        {"path":["P","f2"],"value":{"__file__type__":False}},
+        {"path":["P","f1","bin","__rev_dbs__","i64"],"value":None},
+        # Parent does not exist, nothing to change
+        {"path":["P","missing","bin"],"value":{"__file__type__":True}},
+    ])
+    assert manifest["P"]["f2"] == {"__file__type__":False}
+    assert manifest["P"]["f1"]["bin"]["__rev_dbs__"] == {}
+    assert "missing" not in manifest["P"]
+
+def apply(manifest,index,changes):
+    collare.apply_manifest_changes(manifest,changes)
+    index.update(changes)
+
+def test_update_replaces_entry():
+    manifest = make_manifest()
+    index = collare.ManifestIndex(manifest)
+    apply(manifest,index,[{"path":["P","f1","other"],"value":{"__file__type__":True,"__hash__":"o0"}},
+        {"path":["P","f1","bin"],"value":None}])
+    assert index.get(["P","f1","other"]).kind == "binary"
+    assert index.get(["P","f1","bin"]) is None
+    assert index.get(["P","f1","bin","i64"]) is None
+    assert list(index.get(["P","f1"]).children) == ["other"]
+
+def test_update_field_of_entry():
+    manifest = make_manifest()
+    index = collare.ManifestIndex(manifest)
+    apply(manifest,index,[{"path":["P","f1","bin","__hash__"],"value":"b1"}])
+    assert index.get(["P","f1","bin"]).digest == "b1"
+    assert index.get(["P","f1","bin","i64"]).latest == 1
+
+@pytest.mark.parametrize("change",[
+    {"path":["P","f1","bin","__rev_dbs__","i64"],"value":{"checked-out":"alice","latest":2,"versions":["v0","v1","v2"],"hashes":["h0","h1","h2"]}},
+    {"path":["P","f1","bin","__rev_dbs__","i64","checked-out"],"value":"alice"},
+])
+def test_update_rev_dbs_delta(change):
+    manifest = make_manifest()
+    index = collare.ManifestIndex(manifest)
+    apply(manifest,index,[change])
+    assert manifest["P"]["f1"]["bin"]["__rev_dbs__"]["i64"]["checked-out"] == "alice"
+    node = index.get(["P","f1","bin","i64"])
+    assert node.locked == "alice"
+    assert node is index.get(["P","f1","bin"]).children["i64"]
+
+def test_update_new_rev_db():
+    manifest = make_manifest()
+    index = collare.ManifestIndex(manifest)
+    apply(manifest,index,[{"path":["P","f1","bin","__rev_dbs__","bndb"],"value":{"checked-out":None,"latest":0,"versions":["v0"]}}])
+    assert index.get(["P","f1","bin","bndb"]).kind == "db"
+    assert index.get(["P","f1","bin","i64"]).latest == 1
+
+def test_read_manifest_stream():
+    expected = make_manifest()
+    lines = [
+        b'{"path":["P"],"value":{}}',
+        b'{"path":["P","f1"],"value":{"__file__type__":false}}',
+        b'{"path":["P","f1","bin"],"value":{"__file__type__":true,"__hash__":"b0"}}',
+        b'',
+        b'{"path":["P","f1","bin","__rev_dbs__","i64"],"value":' + collare.json.dumps(expected["P"]["f1"]["bin"]["__rev_dbs__"]["i64"]).encode() + b'}',
+    ]
+    manifest, index = collare.read_manifest_stream(collare.iter_lines([b"\n".join(lines)[:50],b"\n".join(lines)[50:]]))
+    assert manifest == expected
+    assert index.get(["P","f1","bin","i64"]).versionHash(1) == "h1"
+    assert index.get(["P","f1","bin"]).value is manifest["P"]["f1"]["bin"]
+
+def test_read_manifest_stream_without_parent():
+    with pytest.raises(ValueError):
+        collare.read_manifest_stream([b'{"path":["P","f1"],"value":{"__file__type__":false}}'])
+
+def test_iter_lines():
+    assert list(collare.iter_lines([b'{"a"',b':1}\n{"b":2}\n',b'',b'{"c"',b':3}'])) == [b'{"a":1}',b'{"b":2}',b'{"c":3}']
+    assert list(collare.iter_lines([b"line\n"])) == [b"line"]
+
+def test_summarized_entry():
+    manifest = {"P":{"__file__type__":False,"bin":{"__file__type__":True,"__rev_dbs__":{
+        "i64":{"checked-out":None,"latest":4,"versions":["v4"],"count":5,"latest_hash":"h4"}}}}}
+    node = collare.ManifestIndex(manifest).get(["P","bin","i64"])
+    assert node.summarized()
+    assert node.versionHash(4) == "h4"
+    assert node.versionHash(3) is None
+    full = collare.ManifestIndex(make_manifest()).get(["P","f1","bin","i64"])
+    assert not full.summarized()
+    assert full.versionHash(0) == "h0"
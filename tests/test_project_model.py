@@ -0,0 +1,67 @@
+import os, pytest
+
+pytest.importorskip("PyQt5")
+os.environ.setdefault("QT_QPA_PLATFORM","offscreen")
+
+from PyQt5.QtWidgets import QApplication
+from collare import collare
+
+application = QApplication.instance() or QApplication([])
+
+class Window:
+    def doesToolExist(self,tool):
+        return True
+
+def make_manifest():
+    return {"P":{"__file__type__":False,"f1":{"__file__type__":False,"bin":{"__file__type__":True,"__rev_dbs__":{
+        "i64":{"checked-out":None,"latest":0,"versions":["v0"]}}}}}}
+
+def expanded_model(manifest):
+    model = collare.ProjectModel(Window())
+    model.sync(manifest)
+    pending = [model.root]
+    while pending:
+        node = pending.pop()
+        model.fetchMore(model.indexFor(node))
+        pending += node.children
+    return model
+
+def node_at(model,path):
+    node = model.root
+    for name in path:
+        node = next(child for child in node.children if child.name == name)
+    return node
+
+def apply(model,manifest,changes):
+    collare.apply_manifest_changes(manifest,changes)
+    return model.sync(manifest,[change["path"] for change in changes])
+
+@pytest.mark.parametrize("change",[
+    {"path":["P","f1","bin","__rev_dbs__","i64"],"value":{"checked-out":"alice","latest":1,"versions":["v0","v1"]}},
+    {"path":["P","f1","bin","__rev_dbs__","i64","checked-out"],"value":"alice"},
+])
+def test_sync_rev_dbs_change(change):
+    manifest = make_manifest()
+    model = expanded_model(manifest)
+    apply(model,manifest,[change])
+    node = node_at(model,["P","f1","bin","i64"])
+    assert node.status == "Checked-out by 'alice'"
+    assert node.value is manifest["P"]["f1"]["bin"]["__rev_dbs__"]["i64"]
+
+def test_sync_new_rev_db_and_entry():
+    manifest = make_manifest()
+    model = expanded_model(manifest)
+    apply(model,manifest,[{"path":["P","f1","bin","__rev_dbs__","bndb"],"value":{"checked-out":None,"latest":0,"versions":["v0"]}},
+        {"path":["P","f1","other"],"value":{"__file__type__":True,"__rev_dbs__":{}}}])
+    assert [child.name for child in node_at(model,["P","f1","bin"]).children] == ["i64","bndb"]
+    assert [child.name for child in node_at(model,["P","f1"]).children] == ["bin","other"]
+
+def test_sync_change_below_missing_node():
+    manifest = make_manifest()
+    model = expanded_model(manifest)
+    # Folder and its content arrive as separate changes, the folder node does not exist when the content is looked up
+    apply(model,manifest,[{"path":["P","f2"],"value":{"__file__type__":False}},
+        {"path":["P","f2","bin"],"value":{"__file__type__":True,"__rev_dbs__":{}}}])
+    assert [child.name for child in node_at(model,["P"]).children] == ["f1","f2"]
+    model.fetchMore(model.indexFor(node_at(model,["P","f2"])))
+    assert [child.name for child in node_at(model,["P","f2"]).children] == ["bin"]
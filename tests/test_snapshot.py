@@ -0,0 +1,26 @@
+import json, os, pytest
+
+pytest.importorskip("PyQt5")
+
+from collare import collare
+
+@pytest.fixture(autouse=True)
+def snapshots(tmp_path,monkeypatch):
+    monkeypatch.setattr(collare,"collare_snapshots",tmp_path / "snapshots")
+    return tmp_path / "snapshots"
+
+def test_snapshot_round_trip(snapshots):
+    manifest = {"P":{"__file__type__":False,"name with \"quotes\"":{"__file__type__":True,"__rev_dbs__":{}}}}
+    collare.save_snapshot("P",json.dumps(manifest),"r1")
+    assert collare.load_snapshot("P") == {"project":"P","revision":"r1","manifest":manifest}
+    assert os.listdir(snapshots) == ["P.json.gz"]
+
+def test_snapshot_replaced(snapshots):
+    collare.save_snapshot("P",json.dumps({"P":{}}),None)
+    collare.save_snapshot("P",json.dumps({"P":{"__file__type__":False}}),"r2")
+    snapshot = collare.load_snapshot("P")
+    assert snapshot["revision"] == "r2"
+    assert snapshot["manifest"] == {"P":{"__file__type__":False}}
+
+def test_missing_snapshot():
+    assert collare.load_snapshot("P") is None
@@ -0,0 +1,41 @@
+import os, pytest
+
+pytest.importorskip("PyQt5")
+
+from collare import collare
+
+def make_tool(directory,name):
+    path = directory / name
+    path.write_text("#!/bin/sh\n")
+    path.chmod(0o755)
+    return str(path)
+
+def test_tools_available_until_scanned(tmp_path,monkeypatch):
+    monkeypatch.setenv("PATH",str(tmp_path))
+    registry = collare.ToolRegistry()
+    # No scan on the calling thread before the background scan finished
+    monkeypatch.setattr(registry,"scan",lambda: pytest.fail("scanned on lookup"))
+    assert registry.resolve("ida64") is None
+    assert registry.hasDBTool("i64")
+    assert registry.executable("ida64") == "ida64"
+
+def test_tools_after_scan(tmp_path,monkeypatch):
+    monkeypatch.setenv("PATH",str(tmp_path))
+    ida = make_tool(tmp_path,"ida64")
+    registry = collare.ToolRegistry()
+    registry.scan()
+    assert registry.resolve("ida64") == ida
+    assert registry.hasDBTool("i64")
+    assert not registry.hasDBTool("bndb")
+    assert not registry.hasDBTool("txt")
+
+def test_tools_rescanned_when_path_changes(tmp_path,monkeypatch):
+    monkeypatch.setenv("PATH",str(tmp_path))
+    registry = collare.ToolRegistry()
+    registry.scan()
+    assert not registry.hasDBTool("bndb")
+    other = tmp_path / "other"
+    other.mkdir()
+    binaryninja = make_tool(other,"binaryninja")
+    monkeypatch.setenv("PATH",os.pathsep.join([str(tmp_path),str(other)]))
+    assert registry.resolve("binaryninja") == binaryninja
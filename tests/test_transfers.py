@@ -0,0 +1,80 @@
+import os, pytest
+
+pytest.importorskip("PyQt5")
+requests = pytest.importorskip("requests")
+
+from collare import collare
+from server import StandInServer
+
+chunk_size = 64 * 1024
+
+@pytest.fixture
+def server():
+    server = StandInServer().start()
+    yield server
+    server.stop()
+
+@pytest.fixture
+def client(server,tmp_path,monkeypatch):
+    monkeypatch.setattr(collare,"collare_transfers",tmp_path / ".transfers")
+    # No retries so that an interrupted transfer fails and has to be resumed by the next call
+    client = collare.CollaREClient(server.url,"user","password",False,dict(collare.default_settings,retries=0))
+    client.capabilities = ["stream_upload","resumable_upload","resumable_download"]
+    client.resume_chunk_size = chunk_size
+    yield client
+    client.close()
+
+def make_file(path,size):
+    content = os.urandom(size)
+    path.write_bytes(content)
+    return content
+
+def posted_chunks(server):
+    return [int(params["index"]) for method, path, params, headers in server.log if path == "/upload/chunk"]
+
+def test_interrupted_upload_resumes_from_missing_chunk(server,client,tmp_path):
+    content = make_file(tmp_path / "binary",5 * chunk_size + 100)
+    values = {"project":"P","path":["P"],"file_name":"binary"}
+    server.drop_chunk = 3
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.upload("push",str(tmp_path / "binary"),values)
+    assert posted_chunks(server) == [0,1,2,3]
+    assert len(os.listdir(tmp_path / ".transfers")) == 1
+
+    response = client.upload("push",str(tmp_path / "binary"),values)
+    assert response.text == "DONE"
+    # Session is asked for its progress and only the missing chunks are sent again
+    assert [path for method, path, params, headers in server.log].count("/upload/status") == 1
+    assert posted_chunks(server) == [0,1,2,3,3,4,5]
+    assert server.files["binary"] == content
+    assert os.listdir(tmp_path / ".transfers") == []
+
+def test_upload_hash_mismatch(server,client,tmp_path):
+    make_file(tmp_path / "binary",2 * chunk_size + 1)
+    server.corrupt_upload = True
+    with pytest.raises(collare.ChecksumError):
+        client.upload("push",str(tmp_path / "binary"),{"project":"P","path":["P"],"file_name":"binary"})
+    # Next attempt starts a new session
+    assert os.listdir(tmp_path / ".transfers") == []
+
+def test_interrupted_download_resumes_with_range(server,client,tmp_path):
+    content = os.urandom(3 * collare.transfer_chunk_size)
+    server.files["db"] = content
+    server.drop_download_after = collare.transfer_chunk_size + 1000
+    file_path = str(tmp_path / "db")
+    values = {"project":"P","path":["P"],"file_name":"db"}
+    with pytest.raises(requests.exceptions.RequestException):
+        client.download("getfile",values,file_path)
+    received = os.path.getsize(file_path + ".part")
+    assert received > 0
+    assert os.path.exists(file_path + ".part.json")
+
+    response, metadata = client.download("getfile",values,file_path)
+    assert response.status_code == 206
+    method, path, params, headers = server.log[-1]
+    assert headers["Range"] == f"bytes={received}-"
+    assert headers["If-Range"] == f'"{metadata["hash"]}"'
+    with open(file_path,"rb") as downloaded:
+        assert downloaded.read() == content
+    assert not os.path.exists(file_path + ".part")
+    assert not os.path.exists(file_path + ".part.json")